@@ -7,10 +7,12 @@ TP1 - Programmation Parallèle
 import pandas as pd
 import os
 import sys
+import tempfile
 import time
 
 # Import de la version de base
 from preprocessing import TweetPreprocessor
+from writers import open_writer
 
 # Import conditionnel de la version optimisée
 try:
@@ -19,6 +21,27 @@ try:
 except:
     optimized_available = False
 
+def benchmark_writers(processed, chunk_size=1000):
+    """Mesure le débit d'écriture de chaque format de sortie disponible"""
+    print("\n💾 Écriture des résultats (Mo/s = octets encodés par le format, avant compression):")
+    configurations = [('jsonl', None), ('jsonl', 'gzip'), ('jsonl', 'zstd'),
+                      ('parquet', None), ('packed', None), ('packed', 'gzip')]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for format, compression in configurations:
+            label = f"{format}{'+' + compression if compression else ''}"
+            path = os.path.join(tmp_dir, label)
+            try:
+                with open_writer(path, format, compression) as writer:
+                    for i in range(0, len(processed), chunk_size):
+                        writer.write_batch(processed[i:i + chunk_size])
+            except ImportError as e:
+                print(f"   • {label:<12} non disponible ({e})")
+                continue
+            print(f"   • {label:<12} {writer.throughput_mb:6.1f} Mo/s  "
+                  f"{writer.rows / writer.write_time:8.0f} tweets/s  "
+                  f"{os.path.getsize(path) / 1e6:6.2f} Mo")
+
 def benchmark():
     """Compare les performances des deux versions"""
     
@@ -79,6 +102,13 @@ def benchmark():
                     print(f"   • Temps total: {exec_time_opt:.3f} secondes")
                     print(f"   • Temps par tweet: {exec_time_opt/len(tweets)*1000:.2f} ms")
                     print(f"   • Tweets/seconde: {len(tweets)/exec_time_opt:.0f}")
+
+                    # Étapes de nettoyage évitées par le chemin rapide
+                    cleaned_count = processor_opt.tweets_cleaned
+                    if cleaned_count:
+                        print("   • Étapes sautées (chemin rapide):")
+                        for stage, skipped in processor_opt.stage_skips.most_common():
+                            print(f"      - {stage}: {skipped} ({skipped/cleaned_count*100:.0f}%)")
         except Exception as e:
             print(f"   ❌ Erreur: {e}")
     else:
@@ -103,6 +133,9 @@ def benchmark():
         else:
             print("\n   💡 L'optimisation peut être améliorée.")
     
+    if 'base' in results:
+        benchmark_writers(processed_base)
+    
     print("\n" + "=" * 70)
     return 0
 
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Détection approximative de quasi-doublons (MinHash + LSH)
+TP1 - Programmation Parallèle
+
+Étape optionnelle après clean_tweet/tokenize : les retweets et le spam
+à base de modèles produisent beaucoup de textes quasi identiques qu'il
+est inutile de traiter en aval.
+
+  - MinHash : signature de `num_perm` minima de hachages des tokens,
+    calculée pour tout un batch en une seule opération NumPy
+  - LSH : la signature est découpée en `bands` bandes ; deux tweets qui
+    partagent une bande sont candidats, puis la similarité de Jaccard
+    estimée est comparée au seuil
+  - Mémoire bornée : seuls les `capacity` derniers tweets conservés sont
+    indexés (fenêtre glissante)
+"""
+
+import argparse
+import collections
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Hachage universel modulo 2^32 : a * h + b tient dans un uint64
+_MASK = np.uint64(0xFFFFFFFF)
+
+
+class MinHasher:
+    """
+    Calcul vectorisé de signatures MinHash
+    """
+
+    def __init__(self, num_perm=64, seed=1):
+        """
+        Args:
+            num_perm (int): Nombre de fonctions de hachage (taille de signature)
+            seed (int): Graine des fonctions de hachage
+        """
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, 2**32, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, 2**32, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, token_lists):
+        """
+        Signatures d'un batch
+
+        Args:
+            token_lists (list): Une liste de tokens par tweet
+
+        Returns:
+            numpy.ndarray: (len(token_lists), num_perm) uint64 ; une ligne
+                de 2^32 (valeur impossible) pour un tweet sans token
+        """
+        # Ensemble de tokens par tweet (MinHash porte sur des ensembles)
+        sets = [set(tokens) for tokens in token_lists]
+        lengths = np.fromiter((len(tokens) for tokens in sets), dtype=np.int64, count=len(sets))
+        result = np.full((len(sets), self.num_perm), 2**32, dtype=np.uint64)
+        non_empty = lengths > 0
+        if not non_empty.any():
+            return result
+
+        # crc32 : hachage stable entre processus (contrairement à hash())
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode('utf-8')) for tokens in sets for token in tokens),
+            dtype=np.uint64,
+        )
+        permuted = (hashes[:, None] * self._a + self._b) & _MASK
+        offsets = np.concatenate(([0], np.cumsum(lengths[non_empty])[:-1]))
+        result[non_empty] = np.minimum.reduceat(permuted, offsets, axis=0)
+        return result
+
+
+class NearDuplicateFilter:
+    """
+    Index LSH en flux à mémoire bornée
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.8, capacity=100000, seed=1):
+        """
+        Args:
+            num_perm (int): Taille des signatures (multiple de bands)
+            bands (int): Nombre de bandes LSH
+            threshold (float): Similarité de Jaccard estimée minimale
+            capacity (int): Nombre maximal de tweets indexés
+            seed (int): Graine des fonctions de hachage
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) doit être un multiple de bands ({bands})")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.capacity = capacity
+        self._min_equal = threshold * num_perm
+        self._band_weights = np.random.RandomState(seed + 1).randint(
+            1, 2**63, size=self.rows, dtype=np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = collections.OrderedDict()
+        self._next_id = 0
+        self.seen = 0
+        self.duplicates = 0
+
+    def _band_keys(self, signatures):
+        """
+        Clé de chaque bande pour un batch de signatures, calculée en une
+        opération NumPy (combinaison linéaire des lignes de la bande)
+
+        Returns:
+            list: Une liste de `bands` entiers par signature
+        """
+        bands = signatures.reshape(len(signatures), self.bands, self.rows)
+        return (bands * self._band_weights).sum(axis=2).tolist()
+
+    def _evict(self):
+        """Retire le plus ancien tweet indexé"""
+        doc_id, (signature, keys) = self._signatures.popitem(last=False)
+        for bucket, key in zip(self._buckets, keys):
+            if bucket.get(key) == doc_id:
+                del bucket[key]
+
+    def _add(self, signature, keys):
+        doc_id = self._next_id
+        self._next_id += 1
+        for bucket, key in zip(self._buckets, keys):
+            bucket[key] = doc_id
+        self._signatures[doc_id] = (signature, keys)
+        if len(self._signatures) > self.capacity:
+            self._evict()
+        return doc_id
+
+    def _find(self, signature, keys):
+        """Identifiant d'un tweet indexé assez similaire, ou None"""
+        checked = set()
+        for bucket, key in zip(self._buckets, keys):
+            doc_id = bucket.get(key)
+            if doc_id is None or doc_id in checked:
+                continue
+            checked.add(doc_id)
+            other = self._signatures[doc_id][0]
+            if np.count_nonzero(other == signature) >= self._min_equal:
+                return doc_id
+        return None
+
+    def check_batch(self, token_lists):
+        """
+        Teste puis indexe un batch de tweets (dans l'ordre)
+
+        Returns:
+            list: Pour chaque tweet, l'identifiant du tweet dont il est un
+                quasi-doublon, ou None (le tweet est alors indexé)
+        """
+        signatures = self.hasher.signatures(token_lists)
+        results = []
+        for tokens, signature, keys in zip(token_lists, signatures, self._band_keys(signatures)):
+            self.seen += 1
+            # Pas de token : rien à comparer, ni doublon ni indexé
+            if not tokens:
+                results.append(None)
+                continue
+            duplicate_of = self._find(signature, keys)
+            if duplicate_of is None:
+                self._add(signature, keys)
+            else:
+                self.duplicates += 1
+            results.append(duplicate_of)
+        return results
+
+    def filter_processed(self, processed, drop=False):
+        """
+        Applique le filtre à une sortie de process_batch
+
+        Args:
+            processed (list): Dictionnaires avec une clé 'cleaned'
+            drop (bool): Retirer les doublons au lieu de les marquer
+
+        Returns:
+            list: Résultats conservés ; sans drop, chaque dictionnaire
+                reçoit une clé 'duplicate' (bool)
+        """
+        flags = self.check_batch([item['cleaned'].split() for item in processed])
+        if drop:
+            return [item for item, flag in zip(processed, flags) if flag is None]
+        for item, flag in zip(processed, flags):
+            item['duplicate'] = flag is not None
+        return processed
+
+
+if __name__ == "__main__":
+    from preprocessing_optimized import TweetPreprocessorOptimized
+
+    parser = argparse.ArgumentParser(description='Détection de quasi-doublons (MinHash/LSH)')
+    parser.add_argument('--size', choices=['small', 'medium', 'large'], default='large',
+                        help='Taille du dataset à utiliser')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Seuil de Jaccard')
+    parser.add_argument('--capacity', type=int, default=100000, help='Tweets indexés au maximum')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Tweets par batch')
+    args = parser.parse_args()
+
+    filename = f'data/tweets_{args.size}.csv'
+    if not os.path.exists(filename):
+        print(f"❌ Erreur: {filename} non trouvé!")
+        print("   Exécutez d'abord: python download_data.py")
+        sys.exit(1)
+
+    tweets = pd.read_csv(filename)['text'].tolist()
+    processor = TweetPreprocessorOptimized()
+    dedup = NearDuplicateFilter(threshold=args.threshold, capacity=args.capacity)
+
+    kept = 0
+    dedup_time = 0.0
+    for i in range(0, len(tweets), args.chunk_size):
+        processed, _ = processor.process_batch_optimized(tweets[i:i + args.chunk_size])
+        start_time = time.perf_counter()
+        kept += len(dedup.filter_processed(processed, drop=True))
+        dedup_time += time.perf_counter() - start_time
+
+    print(f"🔁 Quasi-doublons (Jaccard ≥ {args.threshold}) sur {len(tweets)} tweets")
+    print(f"   • Conservés: {kept}")
+    print(f"   • Doublons retirés: {dedup.duplicates} ({dedup.duplicates / len(tweets) * 100:.1f}%)")
+    print(f"   • Temps MinHash/LSH: {dedup_time:.3f} s ({len(tweets) / dedup_time:.0f} tweets/s)")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Traitement paresseux : les résultats sont produits au fil de l'eau
+TP1 - Programmation Parallèle
+
+Contrairement à process_batch / process_batch_optimized, qui rendent la
+main une fois tous les tweets traités, iter_process accepte n'importe
+quel itérable (liste, fichier, générateur...) et renvoie un générateur :
+le consommateur peut écrire ou agréger dès le premier résultat, et seuls
+`max_in_flight` chunks sont en mémoire à la fois.
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from preprocessing_optimized import TweetPreprocessorOptimized
+from staged_pipeline import init_worker, process_chunk
+
+
+def _chunks(tweets, chunk_size):
+    """Découpe paresseusement un itérable en listes de chunk_size éléments"""
+    iterator = iter(tweets)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_parallel(chunks, workers, max_in_flight, ordered):
+    """Chunks traités par un pool de processus, au plus max_in_flight en cours"""
+    pool = ProcessPoolExecutor(workers, initializer=init_worker)
+    pending = []
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(process_chunk, chunk))
+            if len(pending) < max_in_flight:
+                continue
+            if ordered:
+                yield pending.pop(0).result()[0]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()[0]
+
+        if ordered:
+            for future in pending:
+                yield future.result()[0]
+        else:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()[0]
+    finally:
+        # Générateur abandonné en cours de route : les chunks pas encore
+        # démarrés sont annulés
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_process(tweets, chunk_size=1, yield_chunks=False, workers=None,
+                 max_in_flight=None, ordered=True):
+    """
+    Traite des tweets à la demande
+
+    Args:
+        tweets (iterable): Tweets (strings), consommés au fur et à mesure
+        chunk_size (int): Tweets traités ensemble (1 = tweet par tweet)
+        yield_chunks (bool): Produire une liste par chunk au lieu d'un
+            résultat par tweet
+        workers (int): Processus de traitement (None ou 0 = séquentiel)
+        max_in_flight (int): Chunks en cours au maximum (défaut: 2 x workers)
+        ordered (bool): Conserver l'ordre d'entrée (sinon ordre de fin)
+
+    Returns:
+        generator: dictionnaires {'original', 'cleaned', 'features'} (ou
+        listes de ces dictionnaires si yield_chunks)
+
+    Raises:
+        ValueError: si chunk_size < 1 ou max_in_flight < 1 (vérifié dès
+            l'appel, pas à la première itération)
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size doit être >= 1 (reçu: {chunk_size})")
+    if max_in_flight is not None and max_in_flight < 1:
+        raise ValueError(f"max_in_flight doit être >= 1 (reçu: {max_in_flight})")
+    return _iter_results(tweets, chunk_size, yield_chunks, workers, max_in_flight, ordered)
+
+
+def _iter_results(tweets, chunk_size, yield_chunks, workers, max_in_flight, ordered):
+    """Générateur de iter_process (arguments déjà validés)"""
+    chunks = _chunks(tweets, chunk_size)
+
+    if workers:
+        results = _iter_parallel(chunks, workers, max_in_flight or 2 * workers, ordered)
+    else:
+        processor = TweetPreprocessorOptimized()
+        results = (processor.process_batch_optimized(chunk)[0] for chunk in chunks)
+
+    if yield_chunks:
+        yield from results
+    else:
+        for processed in results:
+            yield from processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Traitement paresseux des tweets')
+    parser.add_argument('--size', choices=['small', 'medium', 'large'], default='large',
+                        help='Taille du dataset à utiliser')
+    parser.add_argument('--chunk-size', type=int, default=100, help='Tweets par chunk')
+    parser.add_argument('--workers', type=int, default=None, help='Processus (défaut: séquentiel)')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='Chunks en cours au maximum')
+    parser.add_argument('--unordered', action='store_true', help="Résultats dans l'ordre de fin")
+    args = parser.parse_args()
+
+    filename = f'data/tweets_{args.size}.csv'
+    if not os.path.exists(filename):
+        print(f"❌ Erreur: {filename} non trouvé!")
+        print("   Exécutez d'abord: python download_data.py")
+        sys.exit(1)
+
+    tweets = pd.read_csv(filename)['text'].tolist()
+
+    start_time = time.perf_counter()
+    TweetPreprocessorOptimized().process_batch_optimized(tweets)
+    batch_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    first_result = None
+    count = 0
+    for result in iter_process(tweets, args.chunk_size, workers=args.workers,
+                               max_in_flight=args.max_in_flight, ordered=not args.unordered):
+        if first_result is None:
+            first_result = time.perf_counter() - start_time
+        count += 1
+    total_time = time.perf_counter() - start_time
+
+    print(f"📊 {len(tweets)} tweets (chunks de {args.chunk_size}, "
+          f"{args.workers or 'séquentiel'} worker(s))")
+    print(f"   • process_batch_optimized: premier résultat après {batch_time*1000:.1f} ms")
+    print(f"   • iter_process:            premier résultat après {first_result*1000:.1f} ms, "
+          f"total {total_time:.3f} s ({count} résultats)")
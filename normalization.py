@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Normalisation Unicode et casefold pour le texte multilingue
+TP1 - Programmation Parallèle
+
+lower() ne suffit pas pour un corpus français/anglais : "é" (U+00E9) et
+"é" décomposé (e + U+0301) sont deux tokens différents, et l'accent
+combinant isolé est même supprimé par l'étape des caractères spéciaux
+("école" devient "ecole"). UnicodeNormalizer applique NFC ou NFKC avant
+cette étape, puis casefold() à la place de lower() ("Straße" -> "strasse").
+
+  - Chemin rapide : un texte ASCII est déjà normalisé (isascii() est en O(1))
+  - Cache : les textes non ASCII répétés (retweets, spam) ne sont
+    normalisés qu'une fois ; le cache est vidé quand il est plein
+"""
+
+import argparse
+import os
+import sys
+import time
+import unicodedata
+
+import pandas as pd
+
+FORMS = ('NFC', 'NFKC')
+
+
+class UnicodeNormalizer:
+    """
+    Normalisation NFC/NFKC + casefold avec chemin rapide ASCII et cache
+    """
+
+    def __init__(self, form='NFC', cache_size=65536):
+        """
+        Args:
+            form (str): 'NFC' (composition) ou 'NFKC' (compatibilité :
+                ligatures, pleine chasse, exposants...)
+            cache_size (int): Nombre maximal de textes en cache
+        """
+        if form not in FORMS:
+            raise ValueError(f"Forme inconnue: {form} (choix: {FORMS})")
+        self.form = form
+        self.cache_size = cache_size
+        self._normalized = {}
+        self._folded = {}
+        self.ascii_skips = 0
+        self.lookups = 0
+        self.cache_misses = 0
+
+    def normalize(self, text):
+        """Forme normale de text (inchangé s'il est ASCII)"""
+        if text.isascii():
+            self.ascii_skips += 1
+            return text
+        self.lookups += 1
+        result = self._normalized.get(text)
+        if result is None:
+            self.cache_misses += 1
+            if len(self._normalized) >= self.cache_size:
+                self._normalized.clear()
+            result = self._normalized[text] = unicodedata.normalize(self.form, text)
+        return result
+
+    def casefold(self, text):
+        """casefold() puis normalisation (lower() suffit pour l'ASCII)"""
+        if text.isascii():
+            return text.lower()
+        self.lookups += 1
+        result = self._folded.get(text)
+        if result is None:
+            self.cache_misses += 1
+            if len(self._folded) >= self.cache_size:
+                self._folded.clear()
+            # casefold() peut produire une forme décomposée ("ǰ" -> j + U+030C)
+            result = self._folded[text] = unicodedata.normalize(self.form, text.casefold())
+        return result
+
+    def normalize_batch(self, texts):
+        """Normalise une liste de textes (les répétitions viennent du cache)"""
+        return [self.normalize(text) for text in texts]
+
+    @property
+    def hit_rate(self):
+        """Part des textes non ASCII servis par le cache"""
+        if not self.lookups:
+            return 0.0
+        return 1 - self.cache_misses / self.lookups
+
+
+if __name__ == "__main__":
+    from preprocessing_optimized import TweetPreprocessorOptimized
+
+    parser = argparse.ArgumentParser(description='Coût de la normalisation Unicode')
+    parser.add_argument('--size', choices=['small', 'medium', 'large'], default='large',
+                        help='Taille du dataset à utiliser')
+    parser.add_argument('--form', choices=FORMS, default='NFC', help='Forme de normalisation')
+    parser.add_argument('--runs', type=int, default=10, help='Répétitions (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    filename = f'data/tweets_{args.size}.csv'
+    if not os.path.exists(filename):
+        print(f"❌ Erreur: {filename} non trouvé!")
+        print("   Exécutez d'abord: python download_data.py")
+        sys.exit(1)
+
+    tweets = pd.read_csv(filename)['text'].tolist()
+
+    # Mesures alternées (machine bruitée) ; nouveau processeur à chaque
+    # répétition pour que le cache parte vide
+    configurations = {'base': {}, 'normalized': {'normalize': args.form}}
+    times = {name: [] for name in configurations}
+    results = {}
+    for _ in range(args.runs):
+        for name, options in configurations.items():
+            processor = TweetPreprocessorOptimized(**options)
+            start_time = time.perf_counter()
+            processed, _ = processor.process_batch_optimized(tweets)
+            times[name].append(time.perf_counter() - start_time)
+            results[name] = (processed, processor)
+    base_time = min(times['base'])
+    normalized_time = min(times['normalized'])
+    base_processed = results['base'][0]
+    normalized_processed, normalized_processor = results['normalized']
+
+    def vocabulary(processed):
+        return {token for item in processed for token in item['cleaned'].split()}
+
+    normalizer = normalized_processor.normalizer
+    overhead = (normalized_time / base_time - 1) * 100
+    print(f"🔤 Normalisation {args.form} + casefold sur {len(tweets)} tweets")
+    print(f"   • Sans normalisation: {len(tweets) / base_time:8.0f} tweets/s")
+    print(f"   • Avec normalisation: {len(tweets) / normalized_time:8.0f} tweets/s "
+          f"(temps {overhead:+.1f}%)")
+    print(f"   • Chemin rapide ASCII: {normalizer.ascii_skips} textes, "
+          f"cache: {normalizer.hit_rate * 100:.0f}% de hits")
+    print(f"   • Vocabulaire: {len(vocabulary(base_processed))} -> "
+          f"{len(vocabulary(normalized_processed))} tokens")
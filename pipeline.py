@@ -0,0 +1,359 @@
+"""
+Pipeline de préprocessing composable
+TP1 - Programmation Parallèle
+
+Les étapes de nettoyage et les features sont déclarées une seule fois.
+Le planificateur fusionne les comptages avec les passes de nettoyage
+(subn au lieu de sub) : compter les URLs ou les mentions pendant la
+passe qui les supprime ne coûte presque rien.
+"""
+
+import re
+import string
+import time
+
+from normalization import UnicodeNormalizer
+
+
+class RegexStep:
+    """
+    Étape de nettoyage basée sur une regex pré-compilée
+    """
+
+    def __init__(self, name, pattern, replacement='', trigger=None, skip_ascii=False):
+        """
+        Args:
+            name (str): Nom unique de l'étape
+            pattern (str): Regex à substituer
+            replacement (str): Texte de remplacement
+            trigger (str): Sous-chaîne nécessaire à une correspondance
+                (l'étape est sautée si elle est absente)
+            skip_ascii (bool): Sauter l'étape sur du texte ASCII
+        """
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.replacement = replacement
+        self.trigger = trigger
+        self.skip_ascii = skip_ascii
+
+    def can_match(self, text):
+        """Test rapide : False si la regex ne peut rien trouver"""
+        if self.trigger is not None and self.trigger not in text:
+            return False
+        if self.skip_ascii and text.isascii():
+            return False
+        return True
+
+    def apply(self, text, count=False):
+        """
+        Applique l'étape
+
+        Returns:
+            tuple: (texte transformé, nombre de correspondances si count)
+        """
+        if not self.can_match(text):
+            return text, 0
+        if count:
+            return self.pattern.subn(self.replacement, text)
+        return self.pattern.sub(self.replacement, text), 0
+
+    def scan(self, text):
+        """Compte les correspondances sans modifier le texte (passe séparée)"""
+        if not self.can_match(text):
+            return 0
+        return sum(1 for _ in self.pattern.finditer(text))
+
+
+class LowercaseStep:
+    """
+    Étape finale : minuscules et suppression des espaces de bord
+    Son comptage est le nombre de caractères majuscules.
+    """
+
+    # Majuscules ASCII supprimées par bytes.translate (boucle C)
+    ASCII_UPPERCASE = string.ascii_uppercase.encode('ascii')
+
+    def __init__(self, name='lowercase'):
+        self.name = name
+
+    def apply(self, text, count=False):
+        uppercase = self.scan(text) if count else 0
+        return text.lower().strip(), uppercase
+
+    def scan(self, text):
+        if text.isascii():
+            return len(text) - len(text.encode('ascii').translate(None, self.ASCII_UPPERCASE))
+        return sum(map(str.isupper, text))
+
+
+class NormalizeStep:
+    """
+    Normalisation Unicode (NFC/NFKC), à placer avant 'special_chars'
+    Son comptage vaut 1 si le texte a été modifié.
+    """
+
+    def __init__(self, normalizer, name='normalize'):
+        self.name = name
+        self.normalizer = normalizer
+
+    def apply(self, text, count=False):
+        normalized = self.normalizer.normalize(text)
+        return normalized, int(count and normalized != text)
+
+    def scan(self, text):
+        return int(self.normalizer.normalize(text) != text)
+
+
+class CasefoldStep(LowercaseStep):
+    """
+    Variante de LowercaseStep avec casefold() ("ß" -> "ss") puis
+    normalisation ; même nom et même comptage (uppercase_ratio inchangé)
+    """
+
+    def __init__(self, normalizer, name='lowercase'):
+        super().__init__(name)
+        self.normalizer = normalizer
+
+    def apply(self, text, count=False):
+        uppercase = self.scan(text) if count else 0
+        return self.normalizer.casefold(text).strip(), uppercase
+
+
+class Feature:
+    """
+    Feature déclarative
+
+    La fonction reçoit (cleaned, token_stats, counts) :
+      - cleaned : texte nettoyé
+      - token_stats : (word_count, total_length, stop_count) ou None
+      - counts : correspondances par nom d'étape
+    """
+
+    def __init__(self, name, compute, counts=(), needs_tokens=False):
+        """
+        Args:
+            name (str): Nom de la feature dans le dictionnaire de sortie
+            compute (callable): Fonction de calcul
+            counts (tuple): Étapes dont le comptage est nécessaire
+            needs_tokens (bool): La feature utilise les statistiques de tokens
+        """
+        self.name = name
+        self.compute = compute
+        self.counts = tuple(counts)
+        self.needs_tokens = needs_tokens
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0
+
+
+def default_steps(normalize=None):
+    """
+    Étapes de nettoyage, dans l'ordre de TweetPreprocessor.clean_tweet
+
+    Args:
+        normalize (str): None, 'NFC' ou 'NFKC' : ajoute NormalizeStep avant
+            'special_chars' et remplace LowercaseStep par CasefoldStep
+    """
+    steps = [
+        RegexStep('http', r'http\S+', trigger='http'),
+        RegexStep('www', r'www.\S+', trigger='www'),
+        RegexStep('mention', r'@\w+', trigger='@'),
+        RegexStep('hashtag', r'#(\w+)', r'\1', trigger='#'),
+        RegexStep('emoji', "["
+            u"\U0001F600-\U0001F64F"
+            u"\U0001F300-\U0001F5FF"
+            u"\U0001F680-\U0001F6FF"
+            u"\U0001F1E0-\U0001F1FF"
+            "]+", skip_ascii=True),
+        RegexStep('special_chars', r'[^\w\s]'),
+        RegexStep('spaces', r'\s+', ' '),
+        LowercaseStep(),
+    ]
+    if normalize:
+        normalizer = UnicodeNormalizer(normalize)
+        steps.insert(5, NormalizeStep(normalizer))
+        steps[-1] = CasefoldStep(normalizer)
+    return steps
+
+
+# Catalogue des features disponibles (les 4 premières = version de base)
+FEATURES = {
+    'word_count': Feature(
+        'word_count', lambda text, stats, counts: stats[0], needs_tokens=True),
+    'char_count': Feature(
+        'char_count', lambda text, stats, counts: len(text) if stats[0] else 0,
+        needs_tokens=True),
+    'avg_word_length': Feature(
+        'avg_word_length', lambda text, stats, counts: _ratio(stats[1], stats[0]),
+        needs_tokens=True),
+    'stop_word_ratio': Feature(
+        'stop_word_ratio', lambda text, stats, counts: _ratio(stats[2], stats[0]),
+        needs_tokens=True),
+    'url_count': Feature(
+        'url_count', lambda text, stats, counts: counts['http'] + counts['www'],
+        counts=('http', 'www')),
+    'mention_count': Feature(
+        'mention_count', lambda text, stats, counts: counts['mention'],
+        counts=('mention',)),
+    'hashtag_count': Feature(
+        'hashtag_count', lambda text, stats, counts: counts['hashtag'],
+        counts=('hashtag',)),
+    'emoji_count': Feature(
+        'emoji_count', lambda text, stats, counts: counts['emoji'],
+        counts=('emoji',)),
+    'uppercase_ratio': Feature(
+        'uppercase_ratio', lambda text, stats, counts: _ratio(counts['lowercase'], len(text)),
+        counts=('lowercase',)),
+}
+
+BASE_FEATURES = ['word_count', 'char_count', 'avg_word_length', 'stop_word_ratio']
+
+
+class PreprocessingPipeline:
+    """
+    Pipeline de nettoyage et d'extraction de features composable
+    """
+
+    def __init__(self, steps=None, features=None):
+        """
+        Args:
+            steps (list): Étapes de nettoyage dans l'ordre (défaut: default_steps())
+            features (list): Noms de features (FEATURES) ou objets Feature
+                (défaut: BASE_FEATURES)
+        """
+        self.stop_words = {
+            'le', 'la', 'de', 'et', 'un', 'une', 'les', 'des',
+            'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that',
+            'is', 'it', 'for', 'on', 'with', 'as', 'was', 'are'
+        }
+        self.steps = default_steps() if steps is None else list(steps)
+        self.features = [
+            FEATURES[feature] if isinstance(feature, str) else feature
+            for feature in (BASE_FEATURES if features is None else features)
+        ]
+        self.plan()
+
+    def plan(self):
+        """
+        Construit le plan d'exécution :
+          - les étapes dont un comptage est demandé utilisent subn (fusion)
+          - un comptage sur une étape absente devient une passe de comptage
+            seule, à la position de l'étape dans default_steps() (même
+            valeur qu'avec l'étape présente)
+          - les statistiques de tokens sont calculées une seule fois
+        """
+        names = [step.name for step in self.steps]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Noms d'étapes dupliqués: {names}")
+
+        requested = []
+        for feature in self.features:
+            for name in feature.counts:
+                if name not in requested:
+                    requested.append(name)
+
+        catalogue = {step.name: step for step in default_steps()}
+        order = {name: index for index, name in enumerate(catalogue)}
+        # Étapes du plan : (étape, comptage fusionné, comptage seul)
+        self._fused = [(step, step.name in requested, False) for step in self.steps]
+        for name in requested:
+            if name in names:
+                continue
+            if name not in catalogue:
+                raise ValueError(f"Étape inconnue pour le comptage: {name}")
+            # Avant la première étape connue qui la suit dans default_steps()
+            position = next(
+                (index for index, (step, _, _) in enumerate(self._fused)
+                 if order.get(step.name, -1) > order[name]),
+                len(self._fused),
+            )
+            self._fused.insert(position, (catalogue[name], True, True))
+        self._needs_tokens = any(feature.needs_tokens for feature in self.features)
+
+    def describe_plan(self):
+        """Décrit le plan (étapes fusionnées et passes supplémentaires)"""
+        lines = []
+        for step, count, scan_only in self._fused:
+            if scan_only:
+                lines.append(f"{step.name}: comptage seul (passe supplémentaire)")
+            else:
+                lines.append(f"{step.name}{' + comptage (fusionné)' if count else ''}")
+        return lines
+
+    def process(self, text):
+        """
+        Nettoie un tweet et calcule ses features
+
+        Returns:
+            tuple: (texte nettoyé, dictionnaire de features)
+        """
+        counts = {}
+        for step, count, scan_only in self._fused:
+            if scan_only:
+                counts[step.name] = step.scan(text)
+                continue
+            text, matches = step.apply(text, count)
+            if count:
+                counts[step.name] = matches
+
+        stats = None
+        if self._needs_tokens:
+            stop_words = self.stop_words
+            tokens = text.split()
+            total_length = 0
+            stop_count = 0
+            for token in tokens:
+                total_length += len(token)
+                if token in stop_words:
+                    stop_count += 1
+            stats = (len(tokens), total_length, stop_count)
+
+        features = {}
+        for feature in self.features:
+            features[feature.name] = feature.compute(text, stats, counts)
+        return text, features
+
+    def process_batch(self, tweets):
+        """
+        Traite un batch de tweets et mesure le temps d'exécution
+
+        Returns:
+            tuple: (processed_tweets, execution_time)
+        """
+        start_time = time.time()
+        processed = []
+
+        for tweet in tweets:
+            cleaned, features = self.process(tweet)
+            processed.append({
+                'original': tweet,
+                'cleaned': cleaned,
+                'features': features
+            })
+
+        execution_time = time.time() - start_time
+        return processed, execution_time
+
+
+if __name__ == "__main__":
+    pipeline = PreprocessingPipeline(features=BASE_FEATURES + [
+        'url_count', 'mention_count', 'hashtag_count', 'uppercase_ratio'
+    ])
+
+    test_tweets = [
+        "Check out this amazing article! 😍 https://example.com #AI #MachineLearning",
+        "@john_doe This is incredible! Thanks for sharing 🙏",
+        "Just finished my Python project 💻 #coding #python"
+    ]
+
+    print("Plan d'exécution:")
+    for line in pipeline.describe_plan():
+        print(f"   • {line}")
+    print("-" * 60)
+
+    for tweet in test_tweets:
+        cleaned, features = pipeline.process(tweet)
+        print(f"\nOriginal: {tweet}")
+        print(f"Nettoyé:  {cleaned}")
+        print(f"Features: {features}")
@@ -109,25 +109,6 @@ class TweetPreprocessor:
             'stop_word_ratio': stop_word_ratio
         }
     
-    # ========================================================================
-    # TODO-PERF1: Implémentez la méthode process_batch
-    # ========================================================================
-    # Cette méthode doit :
-    # 1. Mesurer le temps de début avec time.time()
-    # 2. Pour chaque tweet dans la liste 'tweets' :
-    #    a. Le nettoyer avec self.clean_tweet()
-    #    b. Extraire les features avec self.extract_features()
-    #    c. Stocker le résultat dans une liste avec un dictionnaire contenant :
-    #       - 'original': le tweet original
-    #       - 'cleaned': le tweet nettoyé
-    #       - 'features': les features extraites
-    # 3. Calculer le temps total d'exécution
-    # 4. Retourner un tuple : (liste_des_tweets_traités, temps_execution)
-    #
-    # Signature : process_batch(self, tweets) -> tuple
-    # ========================================================================
-
-    
     def process_batch(self, tweets):
         """
         Traite un batch de tweets et mesure le temps d'exécution
@@ -140,8 +121,21 @@ class TweetPreprocessor:
                    - processed_tweets: liste de dictionnaires
                    - execution_time: temps en secondes
         """
-        # À IMPLÉMENTER
-        pass
+        start_time = time.time()
+        processed = []
+        
+        for tweet in tweets:
+            cleaned = self.clean_tweet(tweet)
+            features = self.extract_features(cleaned)
+            
+            processed.append({
+                'original': tweet,
+                'cleaned': cleaned,
+                'features': features
+            })
+        
+        execution_time = time.time() - start_time
+        return processed, execution_time
 
 
 # Code de test
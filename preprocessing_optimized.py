@@ -8,13 +8,24 @@ import time
 import pandas as pd
 from collections import Counter
 
+from normalization import UnicodeNormalizer
+
 class TweetPreprocessorOptimized:
     """
     Version optimisée du preprocessor avec regex pré-compilés
     """
     
-    def __init__(self):
-        """Initialise avec des regex pré-compilés pour la performance"""
+    def __init__(self, fast_path=True, normalize=None):
+        """
+        Initialise avec des regex pré-compilés pour la performance
+        
+        Args:
+            fast_path (bool): Saute les substitutions inutiles dans
+                clean_tweet_optimized (False = chemin complet)
+            normalize (str): None (comme la version de base), 'NFC' ou
+                'NFKC' : normalisation Unicode avant la suppression des
+                caractères spéciaux et casefold() au lieu de lower()
+        """
         # Stop words (identiques à la version de base)
         self.stop_words = {
             'le', 'la', 'de', 'et', 'un', 'une', 'les', 'des',
@@ -23,7 +34,15 @@ class TweetPreprocessorOptimized:
         }
         
         # PRÉ-COMPILATION des patterns regex (optimisation clé!)
-        self.url_pattern = re.compile(r'http\S+|www.\S+')
+        # URLs : deux passes comme la version de base (une alternance unique
+        # donne un autre résultat sur 'wwwhttp://x ...')
+        self.url_pattern = re.compile(r'http\S+')
+        self.www_pattern = re.compile(r'www.\S+')
+        # Variantes à groupe capturant pour récupérer les entités avec split()
+        self.url_split_pattern = re.compile(r'(http\S+)')
+        self.www_split_pattern = re.compile(r'(www.\S+)')
+        self.mention_split_pattern = re.compile(r'@(\w+)')
+        self.hashtag_split_pattern = re.compile(r'#(\w+)')
         self.mention_pattern = re.compile(r'@\w+')
         self.hashtag_pattern = re.compile(r'#(\w+)')
         self.emoji_pattern = re.compile("["
@@ -34,56 +53,160 @@ class TweetPreprocessorOptimized:
             "]+", flags=re.UNICODE)
         self.special_chars_pattern = re.compile(r'[^\w\s]')
         self.multiple_spaces_pattern = re.compile(r'\s+')
-    
-    # ========================================================================
-    # TODO-OPT1: Optimisez la méthode clean_tweet_optimized
-    # ========================================================================
-    # Instructions :
-    # 1. Utilisez les patterns pré-compilés (self.url_pattern, etc.)
-    #    au lieu d'appeler re.sub() directement
-    # 2. Syntaxe : self.url_pattern.sub('', text)
-    # 3. Appliquez les substitutions dans cet ordre :
-    #    - URLs (self.url_pattern)
-    #    - Mentions (self.mention_pattern)
-    #    - Hashtags (self.hashtag_pattern) - attention au groupe de capture
-    #    - Emojis (self.emoji_pattern)
-    #    - Caractères spéciaux (self.special_chars_pattern)
-    #    - Espaces multiples (self.multiple_spaces_pattern)
-    # 4. Ne faites la conversion en minuscules qu'une seule fois à la fin
-    # ========================================================================
+        
+        # Statistiques du chemin rapide : nombre d'étapes sautées par nom
+        self.fast_path = fast_path
+        self.stage_skips = Counter()
+        self.tweets_cleaned = 0
+        
+        self.normalizer = UnicodeNormalizer(normalize) if normalize else None
     
     def clean_tweet_optimized(self, text):
         """
         Version optimisée du nettoyage de tweet
         
+        Un pré-classement très peu coûteux (tests `in` et `str.isascii()`)
+        évite les substitutions qui ne peuvent rien changer au texte.
+        Le résultat est identique octet pour octet au chemin complet.
+        
         Args:
             text (str): Texte à nettoyer
             
         Returns:
             str: Texte nettoyé
         """
-        # À IMPLÉMENTER
-        # Utilisez les patterns pré-compilés pour optimiser
-        pass
+        if not self.fast_path:
+            text = self.url_pattern.sub('', text)
+            text = self.www_pattern.sub('', text)
+            text = self.mention_pattern.sub('', text)
+            text = self.hashtag_pattern.sub(r'\1', text)
+            text = self.emoji_pattern.sub('', text)
+            if self.normalizer:
+                text = self.normalizer.normalize(text)
+            text = self.special_chars_pattern.sub('', text)
+            text = self.multiple_spaces_pattern.sub(' ', text)
+            return self._lowercase(text)
+        
+        skips = self.stage_skips
+        self.tweets_cleaned += 1
+        
+        # Chaque test porte sur le texte courant : une étape précédente
+        # peut par exemple créer un double espace
+        if 'http' in text:
+            text = self.url_pattern.sub('', text)
+        else:
+            skips['http'] += 1
+        
+        if 'www' in text:
+            text = self.www_pattern.sub('', text)
+        else:
+            skips['www'] += 1
+        
+        if '@' in text:
+            text = self.mention_pattern.sub('', text)
+        else:
+            skips['mention'] += 1
+        
+        if '#' in text:
+            text = self.hashtag_pattern.sub(r'\1', text)
+        else:
+            skips['hashtag'] += 1
+        
+        # Les emojis ciblés sont tous hors ASCII (isascii() est en O(1))
+        if text.isascii():
+            skips['emoji'] += 1
+        else:
+            text = self.emoji_pattern.sub('', text)
+        
+        return self._finish_cleaning(text)
+    
+    def _finish_cleaning(self, text):
+        """Caractères spéciaux, espaces multiples et minuscules (chemin rapide)"""
+        skips = self.stage_skips
+        
+        # Avant les caractères spéciaux : un accent combinant isolé serait supprimé
+        if self.normalizer:
+            text = self.normalizer.normalize(text)
+        
+        # Lettres/chiffres séparés par des espaces simples : ni caractère
+        # spécial ni espace à fusionner (isalnum() est plus strict que \w)
+        if text.replace(' ', '').isalnum():
+            skips['special_chars'] += 1
+            if '  ' in text:
+                text = self.multiple_spaces_pattern.sub(' ', text)
+            else:
+                skips['spaces'] += 1
+        else:
+            text = self.special_chars_pattern.sub('', text)
+            text = self.multiple_spaces_pattern.sub(' ', text)
+        
+        return self._lowercase(text)
+    
+    def _lowercase(self, text):
+        """Minuscules (casefold si la normalisation est activée) et bords"""
+        if self.normalizer:
+            return self.normalizer.casefold(text).strip()
+        return text.lower().strip()
+    
+    @staticmethod
+    def _url_domain(url):
+        """Domaine d'une URL supprimée ('' si introuvable)"""
+        _, scheme_sep, rest = url.partition('://')
+        if not scheme_sep:
+            if not url.startswith('www'):
+                return ''
+            rest = url
+        return rest.partition('/')[0].partition('?')[0].partition('#')[0].lower()
+    
+    def clean_tweet_with_entities(self, text):
+        """
+        Nettoie un tweet et récupère les entités supprimées pendant la
+        même passe : split() avec groupe capturant renvoie à la fois les
+        morceaux conservés et les correspondances (pas de 2e regex)
+        
+        Args:
+            text (str): Texte à nettoyer
+            
+        Returns:
+            tuple: (texte nettoyé, hashtags, mentions, domaines d'URL,
+                    nombre de séquences emoji) ; les entités sont des tuples.
+                    Une séquence = une correspondance de emoji_pattern, comme
+                    la feature emoji_count du pipeline ("😍😍😍" compte 1)
+        """
+        urls = []
+        mentions = ()
+        hashtags = ()
+        
+        if 'http' in text:
+            parts = self.url_split_pattern.split(text)
+            text = ''.join(parts[::2])
+            urls = parts[1::2]
+        if 'www' in text:
+            parts = self.www_split_pattern.split(text)
+            text = ''.join(parts[::2])
+            urls += parts[1::2]
+        if '@' in text:
+            parts = self.mention_split_pattern.split(text)
+            text = ''.join(parts[::2])
+            mentions = tuple(parts[1::2])
+        if '#' in text:
+            # Le texte du hashtag est conservé : parts[1::2] reste dans le texte
+            parts = self.hashtag_split_pattern.split(text)
+            text = ''.join(parts)
+            hashtags = tuple(parts[1::2])
+        
+        # subn compte les séquences pendant la passe qui les supprime
+        emoji_count = 0
+        if not text.isascii():
+            text, emoji_count = self.emoji_pattern.subn('', text)
+        
+        domains = tuple(domain for domain in map(self._url_domain, urls) if domain)
+        return self._finish_cleaning(text), hashtags, mentions, domains, emoji_count
     
     def tokenize_fast(self, text):
         """Tokenisation rapide (déjà optimisée)"""
         return text.split()
     
-    # ========================================================================
-    # TODO-OPT2: Optimisez extract_features_optimized
-    # ========================================================================
-    # Instructions :
-    # 1. Tokenisez une seule fois au début avec self.tokenize_fast()
-    # 2. Évitez de parcourir les tokens plusieurs fois
-    # 3. Calculez toutes les features en un seul parcours si possible :
-    #    - word_count = len(tokens)
-    #    - char_count = len(text)
-    #    - Pour avg_word_length et stop_word_ratio, utilisez une seule boucle
-    # 4. Utilisez une compréhension de liste pour compter les stop words :
-    #    stop_count = sum(1 for token in tokens if token in self.stop_words)
-    # ========================================================================
-    
     def extract_features_optimized(self, text):
         """
         Version optimisée de l'extraction de features
@@ -94,9 +217,32 @@ class TweetPreprocessorOptimized:
         Returns:
             dict: Features extraites
         """
-        # À IMPLÉMENTER
-        # Optimisez les calculs pour éviter les parcours multiples
-        pass
+        tokens = self.tokenize_fast(text)
+        word_count = len(tokens)
+        
+        if not word_count:
+            return {
+                'word_count': 0,
+                'char_count': 0,
+                'avg_word_length': 0,
+                'stop_word_ratio': 0
+            }
+        
+        # Un seul parcours des tokens pour les longueurs et les stop words
+        stop_words = self.stop_words
+        total_length = 0
+        stop_count = 0
+        for token in tokens:
+            total_length += len(token)
+            if token in stop_words:
+                stop_count += 1
+        
+        return {
+            'word_count': word_count,
+            'char_count': len(text),
+            'avg_word_length': total_length / word_count,
+            'stop_word_ratio': stop_count / word_count
+        }
     
     def process_batch_optimized(self, tweets):
         """
@@ -119,6 +265,46 @@ class TweetPreprocessorOptimized:
         
         execution_time = time.time() - start_time
         return processed, execution_time
+    
+    def process_batch_with_entities(self, tweets):
+        """
+        Comme process_batch_optimized, en récupérant aussi les entités
+        supprimées par le nettoyage, sous forme de colonnes par batch
+        
+        Returns:
+            tuple: (processed, entities, execution_time)
+                   - entities: {'hashtags', 'mentions', 'url_domains',
+                     'emoji_count'} -> une valeur par tweet
+        """
+        start_time = time.time()
+        processed = []
+        hashtags = []
+        mentions = []
+        url_domains = []
+        emoji_counts = []
+        
+        for tweet in tweets:
+            cleaned, tags, users, domains, emoji_count = self.clean_tweet_with_entities(tweet)
+            features = self.extract_features_optimized(cleaned)
+            
+            processed.append({
+                'original': tweet,
+                'cleaned': cleaned,
+                'features': features
+            })
+            hashtags.append(tags)
+            mentions.append(users)
+            url_domains.append(domains)
+            emoji_counts.append(emoji_count)
+        
+        entities = {
+            'hashtags': hashtags,
+            'mentions': mentions,
+            'url_domains': url_domains,
+            'emoji_count': emoji_counts
+        }
+        execution_time = time.time() - start_time
+        return processed, entities, execution_time
 
 
 # Test de la version optimisée
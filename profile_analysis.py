@@ -3,11 +3,13 @@ Script de profiling pour identifier les goulots d'étranglement
 TP1 - Programmation Parallèle
 """
 
+import argparse
 import cProfile
 import pstats
 import pandas as pd
 import os
 from preprocessing import TweetPreprocessor
+from sampling_profiler import SamplingProfiler
 
 def profile_preprocessing():
     """
@@ -55,5 +57,43 @@ def profile_preprocessing():
     print("   Complétez le code de profiling dans profile_analysis.py")
 
 
+def profile_sampling(output='profile.folded', interval=0.005):
+    """
+    Profile process_batch par échantillonnage (faible surcoût)
+    et écrit les piles au format folded pour un flame graph
+    """
+    if not os.path.exists('data/tweets_medium.csv'):
+        print("❌ Erreur: Fichier data/tweets_medium.csv non trouvé!")
+        print("   Exécutez d'abord: python download_data.py")
+        return
+    
+    df = pd.read_csv('data/tweets_medium.csv')
+    tweets = df['text'].tolist()
+    processor = TweetPreprocessor()
+    
+    print(f"🔍 Profiling par échantillonnage ({interval*1000:.1f} ms) sur {len(tweets)} tweets...")
+    with SamplingProfiler(interval) as profiler:
+        _, exec_time = processor.process_batch(tweets)
+    profiler.write_folded(output)
+    
+    print(f"   ✅ {profiler.samples} échantillons, {exec_time:.3f} secondes")
+    print("\n🔝 Top 10 fonctions (temps propre):")
+    for label, samples in profiler.top(10):
+        print(f"   {samples / profiler.samples * 100:5.1f}%  {label}")
+    print(f"\n🔥 Piles folded: {output}")
+    print(f"   Flame graph: flamegraph.pl {output} > profile.svg")
+
+
 if __name__ == "__main__":
-    profile_preprocessing()
+    parser = argparse.ArgumentParser(description='Profiling du preprocessing')
+    parser.add_argument('--sampling', action='store_true',
+                        help='Profiler par échantillonnage (sortie folded) au lieu de cProfile')
+    parser.add_argument('--output', default='profile.folded', help='Fichier folded de sortie')
+    parser.add_argument('--interval', type=float, default=0.005,
+                        help="Période d'échantillonnage en secondes")
+    args = parser.parse_args()
+    
+    if args.sampling:
+        profile_sampling(args.output, args.interval)
+    else:
+        profile_preprocessing()
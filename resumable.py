@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Traitement reprenable de très gros corpus
+TP1 - Programmation Parallèle
+
+Le CSV est traité par chunks. Après chaque chunk, la sortie JSON Lines
+est synchronisée sur disque puis un petit fichier de checkpoint est
+remplacé atomiquement avec :
+  - rows_done    : lignes d'entrée déjà traitées et écrites
+  - input_offset : position (octets) dans le CSV après ces lignes
+  - output_bytes : taille de la sortie correspondant à ces lignes
+
+Après un crash, la sortie est tronquée à output_bytes (ce qui efface un
+chunk écrit à moitié) et la lecture reprend directement à input_offset
+(seek, sans relire les lignes déjà traitées) : aucune ligne n'est
+retraitée ni dupliquée.
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+from preprocessing_optimized import TweetPreprocessorOptimized
+from writers import jsonl_chunk
+
+
+def _write_atomic(path, payload):
+    """Écrit un JSON via fichier temporaire + os.replace (atomique)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ResumableBatchJob:
+    """
+    Job de preprocessing par chunks avec checkpoint
+    """
+
+    def __init__(self, input_path, output_path, checkpoint_path=None, chunk_size=1000):
+        """
+        Args:
+            input_path (str): CSV avec une colonne 'text'
+            output_path (str): Fichier JSON Lines de sortie
+            checkpoint_path (str): Fichier de checkpoint (défaut: <output>.ckpt)
+            chunk_size (int): Lignes par chunk (une validation par chunk)
+        """
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + '.ckpt'
+        self.chunk_size = chunk_size
+        self.processor = TweetPreprocessorOptimized()
+
+    def _input_signature(self):
+        """Identifie le fichier d'entrée pour refuser un checkpoint périmé"""
+        stat = os.stat(self.input_path)
+        return {'input': os.path.abspath(self.input_path),
+                'input_size': stat.st_size, 'input_mtime': stat.st_mtime}
+
+    def load_checkpoint(self):
+        """
+        Returns:
+            dict: Checkpoint existant, ou état initial s'il n'y en a pas
+
+        Raises:
+            ValueError: si le checkpoint concerne une autre entrée
+        """
+        signature = self._input_signature()
+        if not os.path.exists(self.checkpoint_path):
+            return dict(signature, rows_done=0, input_offset=0, output_bytes=0, complete=False)
+
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        for key, value in signature.items():
+            if checkpoint.get(key) != value:
+                raise ValueError(
+                    f"Checkpoint {self.checkpoint_path} incompatible ({key} a changé) : "
+                    f"supprimez-le pour repartir de zéro"
+                )
+        if 'input_offset' not in checkpoint:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint_path} sans input_offset (ancienne version) : "
+                f"supprimez-le pour repartir de zéro"
+            )
+        return checkpoint
+
+    def _read_chunks(self, offset):
+        """
+        Lit le CSV par chunks à partir d'une position en octets
+
+        Un chunk fait chunk_size lignes du fichier, prolongé si besoin
+        jusqu'à une fin d'enregistrement (nombre pair de guillemets : un
+        tweet peut contenir un retour à la ligne entre guillemets), puis
+        est analysé par pandas avec l'en-tête.
+
+        Yields:
+            tuple: (DataFrame du chunk, position en octets après le chunk)
+        """
+        with open(self.input_path, 'rb') as f:
+            header = f.readline()
+            if offset:
+                f.seek(offset)
+            while True:
+                lines = list(itertools.islice(f, self.chunk_size))
+                if not lines:
+                    return
+                data = b''.join(lines)
+                quotes = data.count(b'"')
+                while quotes % 2:
+                    line = f.readline()
+                    if not line:
+                        break
+                    data += line
+                    quotes += line.count(b'"')
+                # Texte toujours lu comme chaîne : un chunk de tweets "42"
+                # serait sinon un entier, un tweet vide ou "NA" un NaN
+                df = pd.read_csv(io.BytesIO(header + data), dtype={'text': str},
+                                 keep_default_na=False)
+                yield df, f.tell()
+
+    def run(self, max_chunks=None):
+        """
+        Traite (ou reprend) le corpus
+
+        Args:
+            max_chunks (int): Arrêt après ce nombre de chunks (simulation d'interruption)
+
+        Returns:
+            tuple: (checkpoint final, lignes traitées par cet appel, temps en secondes)
+        """
+        start_time = time.time()
+        checkpoint = self.load_checkpoint()
+        if checkpoint['complete']:
+            return checkpoint, 0, time.time() - start_time
+
+        if checkpoint['output_bytes'] == 0:
+            open(self.output_path, 'wb').close()
+        elif (not os.path.exists(self.output_path)
+              or os.path.getsize(self.output_path) < checkpoint['output_bytes']):
+            raise ValueError(
+                f"Sortie {self.output_path} absente ou plus courte que le checkpoint : "
+                f"supprimez {self.checkpoint_path} pour repartir de zéro"
+            )
+
+        rows_this_run = 0
+        chunks = 0
+        with open(self.output_path, 'r+b') as output:
+            # Efface un éventuel chunk non validé avant le crash
+            output.truncate(checkpoint['output_bytes'])
+            output.seek(checkpoint['output_bytes'])
+
+            for df, input_offset in self._read_chunks(checkpoint['input_offset']):
+                if max_chunks is not None and chunks >= max_chunks:
+                    return checkpoint, rows_this_run, time.time() - start_time
+
+                processed, _ = self.processor.process_batch_optimized(df['text'].tolist())
+                data = jsonl_chunk(processed).encode('utf-8')
+                output.write(data)
+                output.flush()
+                os.fsync(output.fileno())
+
+                # Validation du chunk : la sortie est sur disque avant le checkpoint
+                checkpoint['rows_done'] += len(df)
+                checkpoint['input_offset'] = input_offset
+                checkpoint['output_bytes'] += len(data)
+                _write_atomic(self.checkpoint_path, checkpoint)
+                rows_this_run += len(df)
+                chunks += 1
+
+        checkpoint['complete'] = True
+        _write_atomic(self.checkpoint_path, checkpoint)
+        return checkpoint, rows_this_run, time.time() - start_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Preprocessing reprenable par chunks')
+    parser.add_argument('--input', default='data/tweets_large.csv', help='CSV à traiter')
+    parser.add_argument('--output', default='results.jsonl', help='Fichier JSON Lines de sortie')
+    parser.add_argument('--checkpoint', default=None, help='Fichier de checkpoint')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Lignes par chunk')
+    parser.add_argument('--max-chunks', type=int, default=None,
+                        help="S'arrêter après N chunks (pour tester la reprise)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ Erreur: {args.input} non trouvé!")
+        print("   Exécutez d'abord: python download_data.py")
+        sys.exit(1)
+
+    job = ResumableBatchJob(args.input, args.output, args.checkpoint, args.chunk_size)
+    try:
+        previous = job.load_checkpoint()
+        if previous['complete']:
+            print(f"✅ Déjà terminé: {args.output} ({previous['rows_done']} lignes)")
+            sys.exit(0)
+        checkpoint, rows, exec_time = job.run(args.max_chunks)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    start_row = previous['rows_done']
+    if start_row:
+        print(f"♻️  Reprise à la ligne {start_row}")
+    print(f"📈 {rows} tweets traités en {exec_time:.3f} secondes")
+    print(f"   • Total validé: {checkpoint['rows_done']} lignes, {checkpoint['output_bytes']} octets")
+    if checkpoint['complete']:
+        print(f"✅ Terminé: {args.output}")
+    else:
+        print(f"⏸️  Interrompu: relancez la même commande pour reprendre ({job.checkpoint_path})")
@@ -0,0 +1,184 @@
+"""
+Profiler par échantillonnage à faible surcoût
+TP1 - Programmation Parallèle
+
+Contrairement à cProfile (déterministe, un hook par appel de fonction),
+un timer ITIMER_PROF envoie SIGPROF toutes les `interval` secondes de
+temps CPU et le handler relève simplement la pile courante. Le surcoût
+reste faible et ne déforme pas les mesures.
+
+La sortie est au format "folded stacks" (une ligne `a;b;c N` par pile),
+lisible par flamegraph.pl, speedscope ou inferno :
+
+    flamegraph.pl profile.folded > profile.svg
+
+Unix uniquement (SIGPROF), et le profiler doit être démarré depuis le
+thread principal : il échantillonne la pile de ce thread. Les piles
+commencent au frame qui a démarré le profiler : les frames parents (et,
+dans un worker forké, ceux hérités du processus parent) sont ignorés.
+"""
+
+import functools
+import glob
+import os
+import signal
+import sys
+from collections import Counter
+from multiprocessing import util
+
+
+class SamplingProfiler:
+    """
+    Échantillonneur de piles piloté par signal
+
+    Utilisation :
+        with SamplingProfiler() as profiler:
+            processor.process_batch(tweets)
+        profiler.write_folded('profile.folded')
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        Args:
+            interval (float): Période d'échantillonnage en secondes de CPU
+        """
+        if not hasattr(signal, 'SIGPROF'):
+            raise RuntimeError("SIGPROF indisponible : profiler réservé aux systèmes Unix")
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._previous_handler = None
+        self._boundary = None
+        self._labels = {}
+
+    def _label(self, code):
+        """Nom affiché d'un frame (mis en cache par objet code)"""
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, signum, frame):
+        stack = []
+        boundary = self._boundary
+        while frame is not None and frame is not boundary:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def start(self, caller=None):
+        """
+        Args:
+            caller (frame): Frame racine des piles (défaut: l'appelant de
+                start()) ; ses parents ne sont pas relevés
+        """
+        if caller is None:
+            caller = sys._getframe(1)
+        self._boundary = caller.f_back
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self._boundary = None
+
+    def __enter__(self):
+        return self.start(sys._getframe(1))
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def folded(self, root=None):
+        """
+        Piles au format folded (racine à gauche)
+
+        Args:
+            root (str): Frame racine ajouté à chaque pile (ex: 'worker-1234')
+
+        Returns:
+            list: Lignes 'a;b;c N' triées
+        """
+        lines = []
+        for codes, count in self.stacks.items():
+            labels = [self._label(code) for code in reversed(codes)]
+            if root:
+                labels.insert(0, root)
+            lines.append(f"{';'.join(labels)} {count}")
+        return sorted(lines)
+
+    def write_folded(self, path, root=None):
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.folded(root):
+                f.write(line + '\n')
+
+    def top(self, limit=10):
+        """Fonctions les plus échantillonnées (temps propre) : [(label, samples)]"""
+        own = Counter()
+        for codes, count in self.stacks.items():
+            own[self._label(codes[0])] += count
+        return own.most_common(limit)
+
+
+def merge_folded(paths, output_path):
+    """
+    Agrège plusieurs fichiers folded (ex: un par worker) en un seul
+
+    Returns:
+        int: Nombre total d'échantillons
+    """
+    merged = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack:
+                    merged[stack] += int(count)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for stack in sorted(merged):
+            f.write(f"{stack} {merged[stack]}\n")
+    return sum(merged.values())
+
+
+def _start_worker_profiler(output_dir, interval, initializer):
+    """Initializer de pool : lance le profiler dans le worker"""
+    if initializer is not None:
+        initializer()
+    # Racine des piles : la boucle du worker (_process_worker), qui appelle
+    # cet initializer ; les frames hérités du parent par fork sont exclus
+    profiler = SamplingProfiler(interval).start(sys._getframe(1))
+    path = os.path.join(output_dir, f'worker-{os.getpid()}.folded')
+
+    def dump():
+        profiler.stop()
+        profiler.write_folded(path, root=f'worker-{os.getpid()}')
+
+    # Les workers multiprocessing sortent par os._exit() : atexit n'est pas
+    # appelé, contrairement aux finaliseurs de multiprocessing.util
+    util.Finalize(profiler, dump, exitpriority=10)
+
+def profiled_initializer(output_dir, interval=0.005, initializer=None):
+    """
+    Initializer (picklable) à passer à un ProcessPoolExecutor pour
+    profiler chaque worker : un fichier worker-<pid>.folded par processus
+
+    Args:
+        output_dir (str): Dossier des fichiers folded
+        interval (float): Période d'échantillonnage
+        initializer (callable): Initializer existant à appeler d'abord
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # Les fichiers d'une exécution précédente fausseraient la fusion
+    for path in glob.glob(os.path.join(output_dir, 'worker-*.folded')):
+        os.remove(path)
+    return functools.partial(_start_worker_profiler, output_dir, interval, initializer)
+
+def merge_worker_profiles(output_dir, output_name='all-workers.folded'):
+    """Fusionne les fichiers worker-*.folded d'un dossier"""
+    paths = sorted(glob.glob(os.path.join(output_dir, 'worker-*.folded')))
+    output_path = os.path.join(output_dir, output_name)
+    return merge_folded(paths, output_path), output_path
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Service de préprocessing résident
+TP1 - Programmation Parallèle
+
+Un pool de processus pré-chauffé (imports et regex déjà prêts) traite
+les tweets reçus sur un endpoint HTTP local. Les petites requêtes
+concurrentes sont regroupées en micro-batchs avant d'être envoyées au
+pool, et les percentiles de latence sont exposés sur /stats.
+
+    POST /process   {"tweets": ["...", ...]}
+                 -> {"results": [{"cleaned": "...", "features": {...}}, ...]}
+    GET  /stats     percentiles de latence et taille des micro-batchs
+    GET  /health    "ok"
+"""
+
+import argparse
+import collections
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from staged_pipeline import init_worker, process_chunk
+
+
+def percentile(sorted_values, fraction):
+    """Percentile par rang le plus proche sur une liste triée"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class SlidingWindow:
+    """Fenêtre glissante des dernières mesures (latences en secondes, tailles...)"""
+
+    def __init__(self, window=10000):
+        self._values = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, latency):
+        with self._lock:
+            self._values.append(latency)
+            self.count += 1
+
+    def mean(self):
+        with self._lock:
+            return sum(self._values) / len(self._values) if self._values else 0.0
+
+    def summary(self):
+        with self._lock:
+            values = sorted(self._values)
+        return {
+            'count': self.count,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p90_ms': percentile(values, 0.90) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': (values[-1] if values else 0.0) * 1000,
+        }
+
+
+class PreprocessingService:
+    """
+    Pool de workers pré-chauffé avec micro-batching des requêtes
+    """
+
+    def __init__(self, workers=None, max_batch=256, max_wait=0.002):
+        """
+        Args:
+            workers (int): Processus du pool (défaut: nombre de CPU)
+            max_batch (int): Tweets maximum par micro-batch
+            max_wait (float): Attente maximale (s) pour compléter un micro-batch
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.latency = SlidingWindow()
+        self.batch_sizes = SlidingWindow()
+        self._pool = ProcessPoolExecutor(self.workers, initializer=init_worker)
+        # Positionné par le thread de callback du pool, lu par le batcher
+        self._pool_broken = threading.Event()
+        self.pool_restarts = 0
+        self._requests = queue.Queue()
+        self._batcher = threading.Thread(target=self._batch_loop, daemon=True)
+
+    def _warm_up(self):
+        """Démarre les workers du pool et les pré-chauffe (imports, regex)"""
+        warmup = [self._pool.submit(process_chunk, ["Warm up @user #tag http://x.co 😊"])
+                  for _ in range(self.workers)]
+        for future in warmup:
+            future.result()
+
+    def start(self):
+        """Démarre les workers et les pré-chauffe avant d'accepter des requêtes"""
+        self._warm_up()
+        self._batcher.start()
+
+    def stop(self):
+        self._requests.put(None)
+        self._batcher.join()
+        self._pool.shutdown()
+
+    def submit(self, tweets):
+        """
+        Soumet une requête (liste de tweets)
+
+        Returns:
+            Future: résultat = liste de {'cleaned', 'features'}
+        """
+        future = Future()
+        self._requests.put((tweets, future, time.perf_counter()))
+        return future
+
+    def process(self, tweets, timeout=None):
+        """Version bloquante de submit()"""
+        return self.submit(tweets).result(timeout)
+
+    def _batch_loop(self):
+        """Regroupe les requêtes en attente jusqu'à max_batch tweets ou max_wait"""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            pending = [request]
+            size = len(request[0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._dispatch(pending)
+                    return
+                pending.append(request)
+                size += len(request[0])
+            self._dispatch(pending)
+
+    def _restart_pool(self):
+        """Remplace un pool cassé (worker tué) par un pool neuf"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = ProcessPoolExecutor(self.workers, initializer=init_worker)
+        self._pool_broken.clear()
+        self.pool_restarts += 1
+        # Pré-chauffage avant le prochain micro-batch, comme au démarrage
+        try:
+            self._warm_up()
+        except BrokenProcessPool:
+            self._pool_broken.set()
+
+    def _dispatch(self, pending):
+        """Envoie un micro-batch au pool (découpé si une requête est grosse)"""
+        tweets = [tweet for request in pending for tweet in request[0]]
+        self.batch_sizes.record(len(tweets))
+        if self._pool_broken.is_set():
+            self._restart_pool()
+
+        # Une erreur ici ne doit ni tuer le thread de batching ni laisser
+        # des requêtes sans réponse
+        chunks = []
+        try:
+            for i in range(0, len(tweets), self.max_batch):
+                chunks.append(self._pool.submit(process_chunk, tweets[i:i + self.max_batch]))
+        except Exception as e:
+            for chunk in chunks:
+                chunk.cancel()
+            for _, future, _ in pending:
+                future.set_exception(e)
+            if isinstance(e, BrokenProcessPool):
+                self._restart_pool()
+            return
+        if not chunks:
+            self._complete(pending, [])
+            return
+
+        remaining = [len(chunks)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                results = [item for chunk in chunks for item in chunk.result()[0]]
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    # Le pool sera remplacé avant le prochain micro-batch
+                    self._pool_broken.set()
+                for _, future, _ in pending:
+                    future.set_exception(e)
+                return
+            self._complete(pending, results)
+
+        for chunk in chunks:
+            chunk.add_done_callback(on_done)
+
+    def _complete(self, pending, results):
+        """Redistribue les résultats du micro-batch à chaque requête"""
+        offset = 0
+        now = time.perf_counter()
+        for tweets, future, received in pending:
+            part = results[offset:offset + len(tweets)]
+            offset += len(tweets)
+            future.set_result([
+                {'cleaned': item['cleaned'], 'features': item['features']} for item in part
+            ])
+            self.latency.record(now - received)
+
+    def stats(self):
+        """Percentiles de latence (ms) et taille moyenne des micro-batchs"""
+        summary = self.latency.summary()
+        summary['batches'] = self.batch_sizes.count
+        summary['avg_batch_size'] = self.batch_sizes.mean()
+        summary['pool_restarts'] = self.pool_restarts
+        return summary
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """Serveur HTTP multi-thread avec une file d'attente TCP plus longue"""
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def make_handler(service, timeout=30.0):
+    """
+    Crée le handler HTTP lié au service
+
+    Args:
+        service (PreprocessingService): Service à exposer
+        timeout (float): Attente maximale (s) d'un résultat avant une erreur 500
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, 'ok')
+            elif self.path == '/stats':
+                self._send_json(200, service.stats())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/process':
+                self._send_json(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                tweets = json.loads(self.rfile.read(length))['tweets']
+                if not isinstance(tweets, list) or not all(isinstance(t, str) for t in tweets):
+                    raise ValueError("'tweets' doit être une liste de chaînes")
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            try:
+                results = service.process(tweets, timeout)
+            except Exception as e:
+                self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+                return
+            self._send_json(200, {'results': results})
+
+        def log_message(self, format, *args):
+            # Pas de log par requête sur le chemin critique
+            pass
+
+    return Handler
+
+
+def benchmark_service(url, clients=8, requests_per_client=200, batch_size=4):
+    """
+    Envoie des petites requêtes concurrentes et affiche les latences
+    observées côté client
+    """
+    tweets = ["Check out this amazing article! 😍 https://example.com #AI"] * batch_size
+    body = json.dumps({'tweets': tweets}).encode('utf-8')
+    latency = SlidingWindow()
+
+    def client():
+        for _ in range(requests_per_client):
+            start_time = time.perf_counter()
+            request = urllib.request.Request(
+                f'{url}/process', data=body, headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request) as response:
+                response.read()
+            latency.record(time.perf_counter() - start_time)
+
+    start_time = time.time()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total_time = time.time() - start_time
+
+    summary = latency.summary()
+    print(f"📈 {summary['count']} requêtes en {total_time:.2f} s "
+          f"({summary['count'] * batch_size / total_time:.0f} tweets/s)")
+    print(f"   • p50: {summary['p50_ms']:.2f} ms  p90: {summary['p90_ms']:.2f} ms  "
+          f"p99: {summary['p99_ms']:.2f} ms  max: {summary['max_ms']:.2f} ms")
+    with urllib.request.urlopen(f'{url}/stats') as response:
+        print(f"   • Serveur: {json.loads(response.read())}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Service de préprocessing résident')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse d\'écoute')
+    parser.add_argument('--port', type=int, default=8765, help='Port d\'écoute')
+    parser.add_argument('--workers', type=int, default=None, help='Nombre de processus')
+    parser.add_argument('--max-batch', type=int, default=256, help='Tweets max par micro-batch')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='Attente max d\'un micro-batch')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='Attente max (s) d\'une réponse avant une erreur 500')
+    parser.add_argument('--bench', action='store_true',
+                        help='Lance un benchmark client contre le service puis s\'arrête')
+    args = parser.parse_args()
+
+    service = PreprocessingService(args.workers, args.max_batch, args.max_wait_ms / 1000)
+    service.start()
+    server = ServiceHTTPServer((args.host, args.port), make_handler(service, args.timeout))
+    url = f'http://{args.host}:{server.server_address[1]}'
+    print(f"🚀 Service prêt sur {url} ({service.workers} workers pré-chauffés)")
+
+    if args.bench:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        benchmark_service(url)
+        server.shutdown()
+    else:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n📊 Latences:", service.stats())
+    server.server_close()
+    service.stop()
+    sys.exit(0)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Pipeline producteur/consommateur à étages
+TP1 - Programmation Parallèle
+
+Lecture (thread), traitement (pool de processus) et écriture (thread)
+se recouvrent. Les étages sont reliés par des files bornées : un étage
+trop lent bloque l'étage précédent (backpressure) au lieu de laisser
+la mémoire grossir.
+"""
+
+import argparse
+import collections
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from preprocessing_optimized import TweetPreprocessorOptimized
+from sampling_profiler import merge_worker_profiles, profiled_initializer
+from writers import COMPRESSIONS, FORMATS, open_writer
+
+# Fin de flux dans les files
+_END = object()
+
+# Preprocessor propre à chaque processus du pool
+_worker_processor = None
+
+
+def init_worker():
+    """Initialise le preprocessor une fois par processus (regex compilées)"""
+    global _worker_processor
+    _worker_processor = TweetPreprocessorOptimized()
+
+def process_chunk(tweets):
+    """Traite un chunk dans un processus du pool"""
+    start_time = time.perf_counter()
+    processed, _ = _worker_processor.process_batch_optimized(tweets)
+    return processed, time.perf_counter() - start_time
+
+
+class MonitoredQueue(queue.Queue):
+    """File bornée qui échantillonne sa profondeur à chaque put()"""
+
+    def __init__(self, name, maxsize):
+        super().__init__(maxsize)
+        self.name = name
+        self.max_depth = 0
+        self.depth_total = 0
+        self.samples = 0
+        self.blocked_time = 0.0
+
+    def put(self, item, block=True, timeout=None):
+        start_time = time.perf_counter()
+        super().put(item, block, timeout)
+        self.blocked_time += time.perf_counter() - start_time
+        depth = self.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+        self.samples += 1
+
+    @property
+    def mean_depth(self):
+        return self.depth_total / self.samples if self.samples else 0
+
+
+class StageMetrics:
+    """Compteurs d'un étage : éléments traités et temps de travail"""
+
+    def __init__(self, name, parallelism=1):
+        self.name = name
+        self.parallelism = parallelism
+        self.items = 0
+        self.chunks = 0
+        self.busy_time = 0.0
+
+    def record(self, items, elapsed):
+        self.items += items
+        self.chunks += 1
+        self.busy_time += elapsed
+
+    @property
+    def capacity(self):
+        """Débit maximal de l'étage (tweets/s si jamais bloqué)"""
+        if not self.busy_time:
+            return float('inf')
+        return self.items / self.busy_time * self.parallelism
+
+
+class StagedPipeline:
+    """
+    Pipeline lecture -> traitement -> écriture à files bornées
+    """
+
+    def __init__(self, workers=None, chunk_size=500, queue_size=4, profile_dir=None):
+        """
+        Args:
+            workers (int): Processus de traitement (défaut: nombre de CPU)
+            chunk_size (int): Tweets par chunk CSV
+            queue_size (int): Capacité de chaque file (en chunks)
+            profile_dir (str): Profiler les workers par échantillonnage et
+                écrire leurs piles folded dans ce dossier
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.profile_dir = profile_dir
+        self.read_queue = MonitoredQueue('lecture -> traitement', queue_size)
+        self.write_queue = MonitoredQueue('traitement -> écriture', queue_size)
+        self.metrics = {
+            'read': StageMetrics('lecture'),
+            'process': StageMetrics('traitement', self.workers),
+            'write': StageMetrics('écriture'),
+        }
+        self._errors = []
+
+    def _reader(self, input_path):
+        """Thread lecteur : parse le CSV par chunks"""
+        try:
+            start_time = time.perf_counter()
+            for df in pd.read_csv(input_path, chunksize=self.chunk_size):
+                tweets = df['text'].tolist()
+                self.metrics['read'].record(len(tweets), time.perf_counter() - start_time)
+                self.read_queue.put(tweets)
+                start_time = time.perf_counter()
+        except Exception as e:
+            self._errors.append(e)
+        finally:
+            self.read_queue.put(_END)
+
+    def _writer(self, output_path, format, compression):
+        """Thread écrivain : sérialise les résultats (writers.open_writer)"""
+        output = None
+        try:
+            if output_path:
+                output = open_writer(output_path, format, compression)
+            while True:
+                processed = self.write_queue.get()
+                if processed is _END:
+                    break
+                start_time = time.perf_counter()
+                if output:
+                    output.write_batch(processed)
+                self.metrics['write'].record(len(processed), time.perf_counter() - start_time)
+        except Exception as e:
+            self._errors.append(e)
+            # Vider la file pour ne pas bloquer le dispatcher
+            while self.write_queue.get() is not _END:
+                pass
+        finally:
+            if output:
+                output.close()
+
+    def run(self, input_path, output_path=None, format='jsonl', compression=None):
+        """
+        Exécute le pipeline complet
+
+        Args:
+            input_path (str): CSV avec une colonne 'text'
+            output_path (str): Fichier de sortie (None = pas d'écriture)
+            format (str): Format de sortie ('jsonl', 'parquet', 'packed')
+            compression (str): None, 'gzip' ou 'zstd'
+
+        Returns:
+            float: Temps total en secondes
+        """
+        start_time = time.time()
+        reader = threading.Thread(target=self._reader, args=(input_path,), daemon=True)
+        writer = threading.Thread(target=self._writer, args=(output_path, format, compression),
+                                  daemon=True)
+        reader.start()
+        writer.start()
+
+        # Le dispatcher borne les chunks en cours dans le pool et les
+        # transmet dans l'ordre de lecture
+        initializer = init_worker
+        if self.profile_dir:
+            initializer = profiled_initializer(self.profile_dir, initializer=init_worker)
+
+        in_flight = collections.deque()
+        try:
+            with ProcessPoolExecutor(self.workers, initializer=initializer) as pool:
+                while True:
+                    tweets = self.read_queue.get()
+                    if tweets is _END:
+                        break
+                    in_flight.append(pool.submit(process_chunk, tweets))
+                    if len(in_flight) >= self.workers + self.queue_size:
+                        self._forward(in_flight.popleft())
+                while in_flight:
+                    self._forward(in_flight.popleft())
+        except BaseException:
+            # Débloquer le lecteur s'il attend de la place dans la file
+            while reader.is_alive():
+                try:
+                    self.read_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise
+        finally:
+            self.write_queue.put(_END)
+            reader.join()
+            writer.join()
+
+        if self._errors:
+            raise self._errors[0]
+        total_time = time.time() - start_time
+        if self.profile_dir:
+            self.profile_samples, self.profile_path = merge_worker_profiles(self.profile_dir)
+        return total_time
+
+    def _forward(self, future):
+        processed, elapsed = future.result()
+        self.metrics['process'].record(len(processed), elapsed)
+        self.write_queue.put(processed)
+
+    def report(self, total_time):
+        """Affiche les métriques par étage et le goulot d'étranglement"""
+        items = self.metrics['process'].items
+        print(f"\n📈 Résultats: {items} tweets en {total_time:.3f} s "
+              f"({items / total_time if total_time else 0:.0f} tweets/s)")
+
+        print("\n⚙️  Étages (capacité = débit si jamais bloqué):")
+        for stage in self.metrics.values():
+            print(f"   • {stage.name:<12} {stage.items:>8} tweets  "
+                  f"travail {stage.busy_time:.3f} s  capacité {stage.capacity:.0f} tweets/s")
+
+        print("\n📦 Files:")
+        for monitored in (self.read_queue, self.write_queue):
+            print(f"   • {monitored.name:<24} profondeur moy. {monitored.mean_depth:.1f} "
+                  f"max {monitored.max_depth}/{self.queue_size}  "
+                  f"attente producteur {monitored.blocked_time:.3f} s")
+
+        bottleneck = min(self.metrics.values(), key=lambda stage: stage.capacity)
+        print(f"\n🐢 Goulot d'étranglement: {bottleneck.name}")
+
+        if self.profile_dir:
+            print(f"\n🔥 Profil des workers: {self.profile_samples} échantillons -> {self.profile_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pipeline à étages lecture/traitement/écriture')
+    parser.add_argument('--size', choices=['small', 'medium', 'large'], default='large',
+                        help='Taille du dataset à utiliser')
+    parser.add_argument('--output', default=None, help='Fichier de sortie')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl', help='Format de sortie')
+    parser.add_argument('--compression', choices=[c for c in COMPRESSIONS if c], default=None,
+                        help='Compression de la sortie')
+    parser.add_argument('--workers', type=int, default=None, help='Nombre de processus')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Tweets par chunk')
+    parser.add_argument('--queue-size', type=int, default=4, help='Capacité des files (chunks)')
+    parser.add_argument('--profile-dir', default=None,
+                        help='Profiler les workers par échantillonnage (fichiers folded)')
+    args = parser.parse_args()
+
+    filename = f'data/tweets_{args.size}.csv'
+    if not os.path.exists(filename):
+        print(f"❌ Erreur: {filename} non trouvé!")
+        print("   Exécutez d'abord: python download_data.py")
+        sys.exit(1)
+
+    pipeline = StagedPipeline(args.workers, args.chunk_size, args.queue_size, args.profile_dir)
+    print(f"🚀 Pipeline à étages sur {filename} ({pipeline.workers} processus)")
+    print("=" * 60)
+    pipeline.report(pipeline.run(filename, args.output, args.format, args.compression))
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Tests différentiels entre les versions du preprocessing
+TP1 - Programmation Parallèle
+
+Chaque moteur enregistré dans ENGINES est comparé à la version de base
+sur tous les datasets et sur des tweets aléatoires : les textes nettoyés
+doivent être identiques et les features égales à une tolérance près.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+
+import pandas as pd
+
+from preprocessing import TweetPreprocessor
+from preprocessing_optimized import TweetPreprocessorOptimized
+from pipeline import PreprocessingPipeline, FEATURES
+from lazy_processing import iter_process
+from resumable import ResumableBatchJob
+from writers import jsonl_chunk
+
+
+def _run_base(tweets):
+    processed, _ = TweetPreprocessor().process_batch(tweets)
+    return processed
+
+def _run_optimized(tweets):
+    processed, _ = TweetPreprocessorOptimized().process_batch_optimized(tweets)
+    return processed
+
+def _run_optimized_full(tweets):
+    processor = TweetPreprocessorOptimized(fast_path=False)
+    processed, _ = processor.process_batch_optimized(tweets)
+    return processed
+
+def _run_optimized_entities(tweets):
+    processed, _, _ = TweetPreprocessorOptimized().process_batch_with_entities(tweets)
+    return processed
+
+def _run_pipeline(tweets):
+    processed, _ = PreprocessingPipeline().process_batch(tweets)
+    return processed
+
+def _run_pipeline_all_features(tweets):
+    processed, _ = PreprocessingPipeline(features=list(FEATURES)).process_batch(tweets)
+    return processed
+
+def _run_lazy_parallel(tweets):
+    return list(iter_process(iter(tweets), chunk_size=97, workers=2, max_in_flight=3))
+
+
+# Moteurs comparés : nom -> fonction(liste de tweets) -> liste de résultats
+# Le premier moteur sert de référence ; ajoutez ici toute nouvelle version
+ENGINES = {
+    'base': _run_base,
+    'optimized': _run_optimized,
+    'optimized_full': _run_optimized_full,
+    'optimized_entities': _run_optimized_entities,
+    'pipeline': _run_pipeline,
+    'pipeline_all_features': _run_pipeline_all_features,
+    'lazy_parallel': _run_lazy_parallel,
+}
+
+# Fragments utilisés par le générateur de tweets aléatoires
+FRAGMENTS = [
+    'hello', 'Python', 'données', 'été', 'été', 'the', 'le', 'a',
+    'ÉCOLE', 'straße', 'x_y', '42', '3.14', 'https://t.co/abc', 'http://x',
+    'www.site.fr', 'www', 'http', '@user', '@', '#tag', '#', '#_', '😍', '🚀',
+    '🇸🇳', '☀️', '!', '?', '...', "'", '-', '&amp;', '\t', '\n', '  ', ' ',
+]
+SEPARATORS = [' ', ' ', ' ', '', '  ', '\t', '\n']
+
+
+def generate_tweets(count, seed=42):
+    """
+    Génère des tweets aléatoires à partir de fragments (URLs, mentions,
+    emojis, accents, ponctuation, espaces variés...)
+
+    Args:
+        count (int): Nombre de tweets à générer
+        seed (int): Graine pour la reproductibilité
+
+    Returns:
+        list: Liste de tweets
+    """
+    rng = random.Random(seed)
+    tweets = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 12)):
+            parts.append(rng.choice(FRAGMENTS))
+            parts.append(rng.choice(SEPARATORS))
+        tweets.append(''.join(parts))
+    return tweets
+
+def load_datasets(data_dir='data'):
+    """Charge tous les datasets CSV disponibles : nom -> liste de tweets"""
+    datasets = {}
+    for filename in sorted(glob.glob(os.path.join(data_dir, 'tweets_*.csv'))):
+        df = pd.read_csv(filename)
+        datasets[os.path.basename(filename)] = df['text'].tolist()
+    return datasets
+
+def find_divergence(reference, candidate, rel_tol=1e-9):
+    """
+    Compare deux listes de résultats et renvoie la première divergence
+
+    Returns:
+        tuple ou None: (index, description) de la première différence
+    """
+    if len(reference) != len(candidate):
+        return len(candidate), f"{len(candidate)} résultats au lieu de {len(reference)}"
+
+    for index, (expected, actual) in enumerate(zip(reference, candidate)):
+        if expected['cleaned'] != actual['cleaned']:
+            return index, f"cleaned {actual['cleaned']!r} != {expected['cleaned']!r}"
+
+        for key, value in expected['features'].items():
+            other = actual['features'].get(key)
+            if other is None or not math.isclose(value, other, rel_tol=rel_tol, abs_tol=1e-12):
+                return index, f"feature {key}: {other!r} != {value!r}"
+
+    return None
+
+def reference_entities(text):
+    """
+    Entités d'un tweet par findall, étape par étape comme clean_tweet
+    (implémentation indépendante de clean_tweet_with_entities)
+
+    Returns:
+        tuple: (hashtags, mentions, domaines d'URL, séquences emoji)
+    """
+    urls = re.findall(r'http\S+', text)
+    text = re.sub(r'http\S+', '', text)
+    www_urls = re.findall(r'www.\S+', text)
+    text = re.sub(r'www.\S+', '', text)
+    mentions = re.findall(r'@(\w+)', text)
+    text = re.sub(r'@\w+', '', text)
+    hashtags = re.findall(r'#(\w+)', text)
+    text = re.sub(r'#(\w+)', r'\1', text)
+    emoji_count = len(TweetPreprocessorOptimized().emoji_pattern.findall(text))
+
+    # Domaine : après le premier '://' (http) ou en tête (www), jusqu'à / ? #
+    domains = [match.group(1) for match in map(re.compile(r'://([^/?#]*)').search, urls) if match]
+    domains += [re.match(r'[^/?#]*', url).group() for url in www_urls]
+    domains = tuple(domain.lower() for domain in domains if domain)
+    return tuple(hashtags), tuple(mentions), domains, emoji_count
+
+def run_entity_check(tweets):
+    """
+    Compare les colonnes d'entités de process_batch_with_entities à
+    reference_entities et aux features de comptage du pipeline
+
+    Returns:
+        int: 0 si tout concorde, 1 sinon
+    """
+    print(f"\n🏷️  Entités: {len(tweets)} tweets")
+    _, entities, _ = TweetPreprocessorOptimized().process_batch_with_entities(tweets)
+    pipeline = PreprocessingPipeline(features=['hashtag_count', 'mention_count', 'emoji_count'])
+    columns = ('hashtags', 'mentions', 'url_domains', 'emoji_count')
+
+    for index, tweet in enumerate(tweets):
+        actual = tuple(entities[column][index] for column in columns)
+        expected = reference_entities(tweet)
+        _, counts = pipeline.process(tweet)
+        expected_counts = (len(expected[0]), len(expected[1]), expected[3])
+        actual_counts = (counts['hashtag_count'], counts['mention_count'], counts['emoji_count'])
+        if actual == expected and actual_counts == expected_counts:
+            continue
+        print(f"   ❌ divergence au tweet #{index}: {tweet!r}")
+        if actual != expected:
+            print(f"      entités {actual!r} != {expected!r}")
+        else:
+            print(f"      comptages du pipeline {actual_counts!r} != {expected_counts!r}")
+        return 1
+
+    print("   ✅ hashtags, mentions, url_domains, emoji_count")
+    return 0
+
+# Tweets qui piègent un lecteur CSV par lignes : retours à la ligne entre
+# guillemets, guillemets échappés (""), virgules, CRLF, ligne vide
+CSV_EDGE_CASES = [
+    'multi\nline "quoted" tweet, with comma',
+    '"""entièrement""" entre guillemets',
+    'fin de ligne Windows\r\nsuite',
+    'paragraphe\n\naprès une ligne vide',
+    '""',
+    ',',
+    '"\n"',
+]
+
+def run_resume_check(tweets):
+    """
+    Vérifie le traitement reprenable (resumable.py) : arrêt après quelques
+    chunks, octets parasites ajoutés à la sortie (chunk écrit à moitié),
+    reprise, puis comparaison octet par octet avec une exécution sans
+    interruption et avec le traitement direct de la liste de tweets
+
+    Returns:
+        int: 0 si toutes les reprises sont identiques, 1 sinon
+    """
+    tweets = CSV_EDGE_CASES + tweets + CSV_EDGE_CASES
+    # Au moins 5 chunks, pour pouvoir interrompre deux fois
+    largest = max(1, len(tweets) // 5)
+    chunk_sizes = sorted({1, min(7, largest), largest})
+    processed, _ = TweetPreprocessorOptimized().process_batch_optimized(tweets)
+    direct = jsonl_chunk(processed).encode('utf-8')
+    print(f"\n♻️  Reprise après interruption: {len(tweets)} tweets")
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, 'input.csv')
+        pd.DataFrame({'id': range(len(tweets)), 'text': tweets}).to_csv(input_path, index=False)
+
+        for chunk_size in chunk_sizes:
+            reference_path = os.path.join(tmp_dir, f'reference-{chunk_size}.jsonl')
+            ResumableBatchJob(input_path, reference_path, chunk_size=chunk_size).run()
+
+            # Deux interruptions de 2 chunks, chacune suivie d'un chunk à moitié écrit
+            output_path = os.path.join(tmp_dir, f'resumed-{chunk_size}.jsonl')
+            interrupted = True
+            for _ in range(2):
+                checkpoint, _, _ = ResumableBatchJob(
+                    input_path, output_path, chunk_size=chunk_size).run(max_chunks=2)
+                interrupted &= not checkpoint['complete']
+                with open(output_path, 'ab') as f:
+                    f.write(b'{"chunk": "interrompu')
+            checkpoint, _, _ = ResumableBatchJob(input_path, output_path, chunk_size=chunk_size).run()
+            if not interrupted:
+                failures += 1
+                print(f"   ❌ chunks de {chunk_size}: trop peu de tweets pour interrompre le job")
+                continue
+
+            with open(reference_path, 'rb') as f:
+                expected = f.read()
+            with open(output_path, 'rb') as f:
+                actual = f.read()
+            if actual == expected == direct and checkpoint['rows_done'] == len(tweets):
+                print(f"   ✅ chunks de {chunk_size}")
+                continue
+
+            failures += 1
+            print(f"   ❌ chunks de {chunk_size}: {checkpoint['rows_done']} lignes, "
+                  f"{len(actual)} octets (sans interruption: {len(expected)}, "
+                  f"traitement direct: {len(direct)})")
+
+    return 1 if failures else 0
+
+def run_jsonl_check(inputs):
+    """
+    Vérifie que writers.jsonl_chunk (gabarit de ligne rempli colonne par
+    colonne) produit exactement json.dumps(ligne, ensure_ascii=False)
+
+    Args:
+        inputs (dict): nom -> liste de tweets
+
+    Returns:
+        int: 0 si toutes les sorties sont identiques, 1 sinon
+    """
+    print("\n💾 JSON Lines (jsonl_chunk == json.dumps)")
+    producers = {
+        'optimized': _run_optimized,
+        'pipeline_all_features': _run_pipeline_all_features,
+        # Colonne booléenne, comme après dedup.filter_processed
+        'duplicate': lambda tweets: [dict(item, duplicate=index % 3 == 0)
+                                     for index, item in enumerate(_run_optimized(tweets))],
+    }
+    failures = 0
+    for name, produce in producers.items():
+        for input_name, tweets in inputs.items():
+            processed = produce(tweets)
+            expected = ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in processed)
+            actual = jsonl_chunk(processed)
+            if actual == expected:
+                continue
+            failures += 1
+            lines = zip(actual.split('\n'), expected.split('\n'))
+            index, (line, expected_line) = next(
+                (i, pair) for i, pair in enumerate(lines) if pair[0] != pair[1])
+            print(f"   ❌ {name} / {input_name}: ligne {index}")
+            print(f"      {line!r}")
+            print(f"      attendu: {expected_line!r}")
+            break
+        else:
+            print(f"   ✅ {name}")
+    return 1 if failures else 0
+
+def run_differential(engines, random_count=2000, seed=42, rel_tol=1e-9):
+    """
+    Lance la comparaison de chaque moteur avec le moteur de référence
+
+    Returns:
+        int: 0 si tous les moteurs concordent, 1 sinon
+    """
+    inputs = load_datasets()
+    if not inputs:
+        print("⚠️  Aucun dataset trouvé (python download_data.py), tests aléatoires seuls")
+    inputs[f'aléatoire (seed={seed})'] = generate_tweets(random_count, seed)
+
+    reference_name = engines[0]
+    failures = 0
+
+    print("=" * 60)
+    print(f"🔬 Tests différentiels (référence: {reference_name})")
+    print("=" * 60)
+
+    for input_name, tweets in inputs.items():
+        print(f"\n📊 {input_name}: {len(tweets)} tweets")
+        reference = ENGINES[reference_name](tweets)
+
+        for name in engines[1:]:
+            divergence = find_divergence(reference, ENGINES[name](tweets), rel_tol)
+            if divergence is None:
+                print(f"   ✅ {name}")
+                continue
+
+            failures += 1
+            index, message = divergence
+            print(f"   ❌ {name}: première divergence au tweet #{index}")
+            if index < len(tweets):
+                print(f"      Entrée: {tweets[index]!r}")
+            print(f"      {message}")
+
+    failures += run_entity_check(generate_tweets(random_count, seed))
+    failures += run_jsonl_check(inputs)
+    failures += run_resume_check(generate_tweets(random_count, seed))
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"❌ {failures} divergence(s) détectée(s)")
+        return 1
+    print("✅ Toutes les versions produisent des résultats identiques")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Tests différentiels du preprocessing')
+    parser.add_argument(
+        '--engines',
+        nargs='+',
+        choices=list(ENGINES),
+        default=list(ENGINES),
+        help='Moteurs à comparer (le premier sert de référence)'
+    )
+    parser.add_argument('--random', type=int, default=2000, help='Nombre de tweets aléatoires')
+    parser.add_argument('--seed', type=int, default=42, help='Graine du générateur aléatoire')
+    parser.add_argument('--rel-tol', type=float, default=1e-9, help='Tolérance relative des features')
+
+    args = parser.parse_args()
+    if len(args.engines) < 2:
+        parser.error("au moins deux moteurs sont nécessaires")
+    sys.exit(run_differential(args.engines, args.random, args.seed, args.rel_tol))
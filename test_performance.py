@@ -7,8 +7,47 @@ TP1 - Programmation Parallèle
 import argparse
 import pandas as pd
 import os
+import re
 import sys
+import time
+import tracemalloc
 from preprocessing import TweetPreprocessor
+from preprocessing_optimized import TweetPreprocessorOptimized
+
+# ============================================================================
+# Budgets de performance (mode --gate)
+# ============================================================================
+# Les débits sont exprimés en "tweets/s de référence" : le débit mesuré est
+# ramené à la machine de référence grâce à calibrate(), qui y prend
+# REFERENCE_CALIBRATION secondes.
+REFERENCE_CALIBRATION = 0.10
+
+# Mesures de référence (médiane de 8 passages de --gate) :
+# (version, taille) -> (tweets/s de référence, octets/tweet au pic)
+REFERENCE_MEASUREMENTS = {
+    ('base', 'small'): (63000, 404),
+    ('base', 'medium'): (60000, 540),
+    ('base', 'large'): (59000, 533),
+    ('optimized', 'small'): (78000, 395),
+    ('optimized', 'medium'): (75500, 535),
+    ('optimized', 'large'): (72000, 533),
+}
+
+# Marge : un budget échoue si le débit tombe sous 67% de la référence ou
+# si la mémoire dépasse la référence / 0.67 (~+50%)
+BUDGET_MARGIN = 0.67
+
+# (version, taille) -> (tweets/s minimum, octets/tweet maximum)
+BUDGETS = {
+    key: (round(rate * BUDGET_MARGIN, -2), round(bytes_per_tweet / BUDGET_MARGIN))
+    for key, (rate, bytes_per_tweet) in REFERENCE_MEASUREMENTS.items()
+}
+
+# Version -> (classe, nom de la méthode de traitement par batch)
+ENGINES = {
+    'base': (TweetPreprocessor, 'process_batch'),
+    'optimized': (TweetPreprocessorOptimized, 'process_batch_optimized'),
+}
 
 def test_performance(size='small'):
     """
@@ -73,6 +112,102 @@ def test_performance(size='small'):
         return 1
 
 
+def calibrate(repeats=5):
+    """
+    Micro-benchmark de calibration (regex + opérations sur chaînes,
+    comme le preprocessing) : meilleur temps sur plusieurs essais
+    
+    Returns:
+        float: Temps en secondes (REFERENCE_CALIBRATION sur la machine de référence)
+    """
+    pattern = re.compile(r'[^\w\s]')
+    text = "Calibration tweet, with #tags @users and punctuation! " * 2
+    best = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(20000):
+            tokens = pattern.sub('', text).lower().split()
+            sum(len(token) for token in tokens)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+def measure(engine, tweets):
+    """
+    Mesure le débit (meilleur essai) et la mémoire d'une version
+    
+    Returns:
+        tuple: (tweets/s, octets alloués au pic par tweet)
+    """
+    cls, method = ENGINES[engine]
+    
+    # Petits datasets : plusieurs essais pour lisser le bruit de mesure
+    repeats = max(5, 10000 // max(len(tweets), 1))
+    best = float('inf')
+    for _ in range(repeats):
+        run = getattr(cls(), method)
+        start_time = time.perf_counter()
+        run(tweets)
+        best = min(best, time.perf_counter() - start_time)
+    
+    # Mémoire mesurée à part : tracemalloc ralentit l'exécution
+    run = getattr(cls(), method)
+    tracemalloc.start()
+    try:
+        run(tweets)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return len(tweets) / best, peak / len(tweets)
+
+def perf_gate(sizes=('small', 'medium', 'large')):
+    """
+    Vérifie les budgets de performance de chaque version sur chaque taille
+    
+    Returns:
+        int: 0 si tous les budgets sont respectés, 1 sinon
+    """
+    missing = [size for size in sizes if not os.path.exists(f'data/tweets_{size}.csv')]
+    if missing:
+        print(f"❌ Erreur: datasets manquants ({', '.join(missing)})")
+        print("   Exécutez d'abord: python download_data.py")
+        return 1
+    
+    print(f"🔧 Calibration de référence: {REFERENCE_CALIBRATION*1000:.0f} ms "
+          f"(refaite avant chaque mesure : la charge de la machine varie)")
+    print("=" * 60)
+    
+    breaches = 0
+    for size in sizes:
+        tweets = pd.read_csv(f'data/tweets_{size}.csv')['text'].tolist()
+        print(f"\n📊 {size} ({len(tweets)} tweets)")
+        
+        for engine in ENGINES:
+            min_rate, max_bytes = BUDGETS[(engine, size)]
+            # Une seconde mesure avant de conclure : un pic de charge
+            # passager ne doit pas faire échouer le budget
+            for _ in range(2):
+                factor = calibrate() / REFERENCE_CALIBRATION
+                rate, bytes_per_tweet = measure(engine, tweets)
+                normalized = rate * factor
+                if normalized >= min_rate:
+                    break
+            ok_rate = normalized >= min_rate
+            ok_bytes = bytes_per_tweet <= max_bytes
+            breaches += (not ok_rate) + (not ok_bytes)
+            
+            print(f"   {'✅' if ok_rate and ok_bytes else '❌'} {engine:<10} "
+                  f"{normalized:8.0f} tweets/s réf. (min {min_rate:.0f}, facteur {factor:.2f})  "
+                  f"{bytes_per_tweet:6.0f} o/tweet (max {max_bytes})")
+    
+    print("\n" + "=" * 60)
+    if breaches:
+        print(f"❌ {breaches} budget(s) dépassé(s)")
+        return 1
+    print("✅ Tous les budgets de performance sont respectés")
+    return 0
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Test de performance du preprocessing')
     parser.add_argument(
@@ -81,6 +216,13 @@ if __name__ == "__main__":
         default='small',
         help='Taille du dataset à utiliser'
     )
+    parser.add_argument(
+        '--gate',
+        action='store_true',
+        help='Vérifie les budgets de performance sur toutes les tailles (code de sortie 1 si dépassement)'
+    )
     
     args = parser.parse_args()
+    if args.gate:
+        sys.exit(perf_gate())
     sys.exit(test_performance(args.size))
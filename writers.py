@@ -0,0 +1,340 @@
+"""
+Écriture en bloc des résultats de preprocessing
+TP1 - Programmation Parallèle
+
+Trois formats, écrits chunk par chunk avec de grosses écritures bufferisées :
+  - 'jsonl'  : JSON Lines (compression gzip ou zstd optionnelle)
+  - 'parquet': Parquet via pyarrow (optionnel)
+  - 'packed' : format colonnaire compact (voir PackedColumnarWriter)
+
+Aucun json.dumps par ligne : les colonnes sont encodées en bloc puis
+insérées dans un gabarit de ligne, ce qui produit exactement le même
+texte que json.dumps.
+"""
+
+import gzip
+import json
+import struct
+import time
+from json.encoder import encode_basestring
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Taille du buffer des fichiers de sortie
+BUFFER_SIZE = 1 << 20
+
+FORMATS = ('jsonl', 'parquet', 'packed')
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+
+class _GzipOutput(gzip.GzipFile):
+    """
+    GzipFile qui ferme aussi le fichier bufferisé fourni : GzipFile.close()
+    laisse ouvert un fileobj externe (fin du buffer et trailer gzip écrits
+    seulement par le ramasse-miettes)
+    """
+
+    def close(self):
+        raw = self.fileobj
+        try:
+            super().close()
+        finally:
+            if raw is not None:
+                raw.close()
+
+
+def _open_output(path, compression):
+    """Ouvre un fichier binaire bufferisé, compressé ou non"""
+    if compression is None:
+        return open(path, 'wb', buffering=BUFFER_SIZE)
+    if compression == 'gzip':
+        return _GzipOutput(fileobj=open(path, 'wb', buffering=BUFFER_SIZE),
+                           mode='wb', compresslevel=6)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard n'est pas installé : pip install zstandard")
+        raw = open(path, 'wb', buffering=BUFFER_SIZE)
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+    raise ValueError(f"Compression inconnue: {compression} (choix: {COMPRESSIONS})")
+
+
+def to_columns(processed):
+    """
+    Transpose une sortie de process_batch en colonnes
+
+    Les features sont aplaties : {'original': [...], 'cleaned': [...],
+    'word_count': [...], ...}
+    """
+    columns = {}
+    if not processed:
+        return columns
+    first = processed[0]
+    for key, value in first.items():
+        if isinstance(value, dict):
+            nested = [item[key] for item in processed]
+            for name in value:
+                columns[name] = [values[name] for values in nested]
+        else:
+            columns[key] = [item[key] for item in processed]
+    return columns
+
+
+def jsonl_chunk(processed):
+    """
+    Sérialise un chunk en JSON Lines (identique à json.dumps ligne par ligne,
+    avec ensure_ascii=False)
+
+    Returns:
+        str: Lignes JSON terminées par '\\n'
+    """
+    if not processed:
+        return ''
+
+    # Gabarit construit d'après la structure de la première ligne
+    parts = []
+    columns = []
+    first = processed[0]
+    for key, value in first.items():
+        if isinstance(value, dict):
+            nested = [item[key] for item in processed]
+            inner = []
+            for name, inner_value in value.items():
+                inner.append(f"{encode_basestring(name)}: %s")
+                columns.append(_encode_column([values[name] for values in nested], inner_value))
+            parts.append(f"{encode_basestring(key)}: {{{', '.join(inner)}}}")
+        else:
+            parts.append(f"{encode_basestring(key)}: %s")
+            columns.append(_encode_column([item[key] for item in processed], value))
+
+    template = '{' + ', '.join(parts) + '}\n'
+    return ''.join(map(template.__mod__, zip(*columns)))
+
+def _encode_column(values, sample):
+    """Encode une colonne en fragments JSON (boucles C : map/encodeur natif)"""
+    if isinstance(sample, str):
+        return map(encode_basestring, values)
+    if isinstance(sample, bool) or sample is None:
+        return map(json.dumps, values)
+    # int/float : repr() donne le même texte que json.dumps
+    return map(repr, values)
+
+
+class _BaseWriter:
+    """
+    Comptage commun : lignes, octets produits, temps d'écriture
+
+    bytes_written a la même définition pour tous les formats : octets
+    encodés par le format, avant compression (gzip/zstd, ou compression
+    des pages Parquet). write_time inclut close() (vidage et fin de fichier).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.bytes_written = 0
+        self.write_time = 0.0
+
+    def write_batch(self, processed):
+        start_time = time.perf_counter()
+        self.bytes_written += self._write(processed)
+        self.rows += len(processed)
+        self.write_time += time.perf_counter() - start_time
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def throughput_mb(self):
+        """Débit d'écriture en Mo/s (données non compressées)"""
+        return self.bytes_written / self.write_time / 1e6 if self.write_time else 0.0
+
+
+class JsonLinesWriter(_BaseWriter):
+    """JSON Lines, compression gzip/zstd optionnelle"""
+
+    def __init__(self, path, compression=None):
+        super().__init__(path)
+        self._file = _open_output(path, compression)
+
+    def _write(self, processed):
+        data = jsonl_chunk(processed).encode('utf-8')
+        self._file.write(data)
+        return len(data)
+
+    def close(self):
+        start_time = time.perf_counter()
+        self._file.close()
+        self.write_time += time.perf_counter() - start_time
+
+
+class ParquetWriter(_BaseWriter):
+    """Parquet (un row group par chunk), nécessite pyarrow"""
+
+    def __init__(self, path, compression=None):
+        if pa is None:
+            raise ImportError("pyarrow n'est pas installé : pip install pyarrow")
+        super().__init__(path)
+        self.compression = compression or 'snappy'
+        self._writer = None
+
+    def _write(self, processed):
+        table = pa.Table.from_pydict(to_columns(processed))
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+        else:
+            # Même schéma pour tous les row groups (ex: int -> float64)
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        # Taille encodée connue seulement après close() (métadonnées du fichier)
+        return 0
+
+    def close(self):
+        if self._writer is None:
+            return
+        start_time = time.perf_counter()
+        self._writer.close()
+        self.write_time += time.perf_counter() - start_time
+
+        # Octets des pages encodées avant compression, comme pour les autres formats
+        metadata = pq.read_metadata(self.path)
+        self.bytes_written = sum(
+            metadata.row_group(i).column(j).total_uncompressed_size
+            for i in range(metadata.num_row_groups)
+            for j in range(metadata.num_columns)
+        )
+
+
+class PackedColumnarWriter(_BaseWriter):
+    """
+    Format colonnaire compact ('packed'), lisible avec read_packed()
+
+    Fichier : MAGIC puis un bloc par chunk
+      bloc    = <I nombre de lignes> <H nombre de colonnes> colonne*
+      colonne = <H longueur du nom> nom <c type> <Q taille> données
+    Types : 'i' int64, 'f' float64, 'b' bool, 's' chaînes UTF-8
+    (offsets int64 de n+1 éléments suivis des octets concaténés)
+    """
+
+    MAGIC = b'TWPK1\n'
+
+    def __init__(self, path, compression=None):
+        super().__init__(path)
+        self._file = _open_output(path, compression)
+        self._file.write(self.MAGIC)
+
+    def _write(self, processed):
+        columns = to_columns(processed)
+        chunks = [struct.pack('<IH', len(processed), len(columns))]
+        for name, values in columns.items():
+            kind, data = _pack_column(values)
+            encoded_name = name.encode('utf-8')
+            chunks.append(struct.pack('<H', len(encoded_name)))
+            chunks.append(encoded_name)
+            chunks.append(struct.pack('<cQ', kind, len(data)))
+            chunks.append(data)
+        block = b''.join(chunks)
+        self._file.write(block)
+        return len(block)
+
+    def close(self):
+        start_time = time.perf_counter()
+        self._file.close()
+        self.write_time += time.perf_counter() - start_time
+
+
+def _pack_column(values):
+    """Encode une colonne : (code de type, octets)"""
+    sample = values[0] if values else 0
+    if isinstance(sample, str):
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum(np.fromiter(map(len, encoded), dtype='<i8', count=len(encoded)), out=offsets[1:])
+        return b's', offsets.tobytes() + b''.join(encoded)
+    if isinstance(sample, bool):
+        return b'b', np.array(values, dtype=np.bool_).tobytes()
+    if all(type(value) is int for value in values):
+        return b'i', np.array(values, dtype='<i8').tobytes()
+    return b'f', np.array(values, dtype='<f8').tobytes()
+
+
+def read_packed(path, compression=None):
+    """
+    Relit un fichier 'packed'
+
+    Returns:
+        dict: nom de colonne -> liste (chaînes) ou numpy.ndarray
+    """
+    if compression == 'gzip':
+        with gzip.open(path, 'rb') as f:
+            data = f.read()
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard n'est pas installé : pip install zstandard")
+        with open(path, 'rb') as f:
+            data = zstandard.ZstdDecompressor().stream_reader(f).read()
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+    magic = PackedColumnarWriter.MAGIC
+    if not data.startswith(magic):
+        raise ValueError(f"{path} n'est pas un fichier packed")
+
+    dtypes = {b'i': '<i8', b'f': '<f8', b'b': np.bool_}
+    columns = {}
+    position = len(magic)
+    while position < len(data):
+        rows, column_count = struct.unpack_from('<IH', data, position)
+        position += struct.calcsize('<IH')
+        for _ in range(column_count):
+            (name_length,) = struct.unpack_from('<H', data, position)
+            position += 2
+            name = data[position:position + name_length].decode('utf-8')
+            position += name_length
+            kind, size = struct.unpack_from('<cQ', data, position)
+            position += struct.calcsize('<cQ')
+            payload = data[position:position + size]
+            position += size
+            if kind == b's':
+                offsets = np.frombuffer(payload, dtype='<i8', count=rows + 1).tolist()
+                blob = payload[(rows + 1) * 8:]
+                values = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(rows)]
+                columns.setdefault(name, []).extend(values)
+            else:
+                array = np.frombuffer(payload, dtype=dtypes[kind])
+                columns[name] = (np.concatenate((columns[name], array))
+                                 if name in columns else array)
+    return columns
+
+
+def open_writer(path, format='jsonl', compression=None):
+    """
+    Crée un writer pour le format demandé
+
+    Args:
+        path (str): Fichier de sortie
+        format (str): 'jsonl', 'parquet' ou 'packed'
+        compression (str): None, 'gzip' ou 'zstd'
+    """
+    if format == 'jsonl':
+        return JsonLinesWriter(path, compression)
+    if format == 'parquet':
+        return ParquetWriter(path, compression)
+    if format == 'packed':
+        return PackedColumnarWriter(path, compression)
+    raise ValueError(f"Format inconnu: {format} (choix: {FORMATS})")